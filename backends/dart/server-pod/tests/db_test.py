@@ -1,16 +1,6 @@
-from locust import FastHttpUser, task, between
+from locust_common.workload import DbTestUser, Route
 
-class NoteUser(FastHttpUser):
-
-    @task
-    def write_note(self):
-        self.client.post("/note/createNote/", json={
-            "note":{
-            "title": "Sample Note",
-            "content": "This is a note content."
-        }})
-
-    @task
-    def read_notes(self):
-        self.client.post("/note/getAllNotes/")
 
+class NoteUser(DbTestUser):
+    create_note = Route('POST', '/note/createNote/', expected=(200,), wrap='note')
+    list_notes = Route('POST', '/note/getAllNotes/')
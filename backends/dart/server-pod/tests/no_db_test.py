@@ -1,10 +1,6 @@
-from locust import FastHttpUser, task, between
+from locust_common.workload import NoDbTestUser, Route
 
-class NoteUser(FastHttpUser):
 
-    @task
-    def no_db_endpoint(self):
-        self.client.post("/note/noDbEndpoint/")
-    @task
-    def no_db_endpoint2(self):
-        self.client.post("/note/noDbEndpoint2/")
\ No newline at end of file
+class NoteUser(NoDbTestUser):
+    no_db_endpoint = Route('POST', '/note/noDbEndpoint/')
+    no_db_endpoint2 = Route('POST', '/note/noDbEndpoint2/')
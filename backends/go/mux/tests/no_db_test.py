@@ -1,11 +1,6 @@
-from locust import FastHttpUser, task, between
+from locust_common.workload import NoDbTestUser, Route
 
-class NoteUser(FastHttpUser):
 
-    @task
-    def no_db_endpoint(self):
-        self.client.get("/no_db_endpoint/")
-
-    @task
-    def no_db_endpoint2(self):
-        self.client.get("/no_db_endpoint2/")
\ No newline at end of file
+class NoteUser(NoDbTestUser):
+    no_db_endpoint = Route('GET', '/no_db_endpoint/')
+    no_db_endpoint2 = Route('GET', '/no_db_endpoint2/')
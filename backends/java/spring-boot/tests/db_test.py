@@ -1,14 +1,6 @@
-from locust import FastHttpUser, task, between
+from locust_common.workload import DbTestUser, Route
 
-class NoteUser(FastHttpUser):
 
-    @task
-    def write_note(self):
-        self.client.post("/notes/", json={
-            "title": "Sample Note",
-            "content": "This is a note content."
-        })
-
-    @task
-    def read_notes(self):
-        self.client.get("/notes/")
+class NoteUser(DbTestUser):
+    create_note = Route('POST', '/notes/', expected=(201,))
+    list_notes = Route('GET', '/notes/')
@@ -0,0 +1,65 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Writes bump this version instead of deleting entries; list keys embed it so
+# stale pages are never read again and expire through the cache TTL.
+VERSION_KEY = 'notes:version'
+
+# Counters are per worker process, the hit ratio is what the reports use
+_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+
+def enabled():
+    return settings.NOTES_CACHE != 'off'
+
+
+async def _version():
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        # Seeded from the clock so an evicted version never rolls back onto old entries
+        await cache.aadd(VERSION_KEY, time.time_ns(), timeout=None)
+        version = await cache.aget(VERSION_KEY)
+    return version
+
+
+def _list_key(request, version):
+    params = '&'.join(f'{name}={value}' for name, value in sorted(request.query_params.items()))
+    return f'notes:list:{version}:{params}'
+
+
+async def lookup(request):
+    # Returns the cache key and the cached page, (None, None) when caching is off
+    if not enabled():
+        return None, None
+    key = _list_key(request, await _version())
+    data = await cache.aget(key)
+    _stats['hits' if data is not None else 'misses'] += 1
+    return key, data
+
+
+async def store(key, data):
+    if key is not None:
+        await cache.aset(key, data)
+
+
+async def invalidate():
+    if not enabled():
+        return
+    _stats['invalidations'] += 1
+    try:
+        await cache.aincr(VERSION_KEY)
+    except ValueError:
+        await cache.aadd(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def stats():
+    lookups = _stats['hits'] + _stats['misses']
+    return {
+        'backend': settings.NOTES_CACHE,
+        'pid': os.getpid(),
+        **_stats,
+        'hit_ratio': _stats['hits'] / lookups if lookups else 0.0,
+    }
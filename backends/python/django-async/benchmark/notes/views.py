@@ -1,21 +1,53 @@
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from adrf.viewsets import ViewSet
 # from asgiref.sync import sync_to_async
 
+from django.conf import settings
+from rest_framework.settings import api_settings
+
+from . import cache as notes_cache
 from .models import Note
+from .renderers import ORJSONRenderer
 from .serializers import NoteSerializer
 
+# Ordered by primary key so pages are deterministic; the after_id cursor turns
+# deep pages into an index range scan instead of an ever-growing offset.
+def notes_page(request):
+    queryset = Note.objects.order_by('pk')
+    after_id = request.query_params.get('after_id')
+    if after_id is not None:
+        try:
+            after_id = int(after_id)
+        except ValueError:
+            raise ValidationError({'after_id': 'A valid integer is required.'})
+        queryset = queryset.filter(pk__gt=after_id)
+    return queryset[:100]
+
+
+FAST_SERIALIZATION = settings.NOTES_SERIALIZER == 'orjson'
+NOTE_FIELDS = ('id', 'title', 'content')
+
+
 class AsyncNoteViewSet(ViewSet):
+    renderer_classes = [ORJSONRenderer] if FAST_SERIALIZATION else api_settings.DEFAULT_RENDERER_CLASSES
 
     # @sync_to_async
     async def get_queryset(self):
-        return Note.objects.all()[:100]
+        return notes_page(self.request)
 
     async def list(self, request):
-        queryset = (await self.get_queryset())
-        serializer = NoteSerializer(queryset, many=True)
-        return Response(await serializer.adata,)
+        key, data = await notes_cache.lookup(request)
+        if data is None:
+            queryset = (await self.get_queryset())
+            if FAST_SERIALIZATION:
+                data = [note async for note in queryset.values(*NOTE_FIELDS)]
+            else:
+                serializer = NoteSerializer(queryset, many=True)
+                data = await serializer.adata
+            await notes_cache.store(key, data)
+        return Response(data,)
 
     async def retrieve(self, request, pk=None):
         queryset = await self.get_queryset()
@@ -27,15 +59,28 @@ class AsyncNoteViewSet(ViewSet):
         serializer = NoteSerializer(data=request.data)
         if serializer.is_valid():
             note = await serializer.asave()
+            await notes_cache.invalidate()
             return Response(await serializer.adata, status=201)
         return Response(serializer.errors, status=400)
 
+    @action(detail=False, methods=['post'])
+    async def bulk(self, request):
+        serializer = NoteSerializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+        # A single multi-row INSERT ... RETURNING for the whole batch
+        notes = await Note.objects.abulk_create(
+            [Note(**item) for item in serializer.validated_data])
+        await notes_cache.invalidate()
+        return Response(await NoteSerializer(notes, many=True).adata, status=201)
+
     async def update(self, request, pk=None):
         queryset = await self.get_queryset()
         note = await queryset.aget(pk=pk)
         serializer = NoteSerializer(note, data=request.data)
         if serializer.is_valid():
             await serializer.asave()
+            await notes_cache.invalidate()
             return Response(await serializer.adata)
         return Response(serializer.errors, status=400)
 
@@ -43,9 +88,14 @@ class AsyncNoteViewSet(ViewSet):
         queryset = await self.get_queryset()
         note = await queryset.aget(pk=pk)
         await note.adelete()
+        await notes_cache.invalidate()
         return Response(status=204)
 
     
+    @action(detail=False, methods=['get'])
+    async def cache_stats(self, request):
+        return Response(notes_cache.stats(), status=200)
+
     @action(detail=False, methods=['get'])
     async def no_db_endpoint(self, request):
         return Response("no db endpoint", status=200)
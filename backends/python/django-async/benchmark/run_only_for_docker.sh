@@ -1,4 +1,39 @@
 cd "${0%/*}"
 python manage.py makemigrations
 python manage.py migrate
-(trap 'kill 0' SIGINT; python manage.py runserver 0.0.0.0:8000 & wait)
\ No newline at end of file
+
+# Derive the worker count from the container CPU limit unless it is set explicitly
+if [ -z "$WEB_CONCURRENCY" ]; then
+    cpu_limit=$(python -c "import math, os; print(max(1, math.ceil(float(os.getenv('SERVICE_CPU_CORE_LIMIT') or 1))))")
+    export WEB_CONCURRENCY=$((cpu_limit * 2 + 1))
+fi
+
+# LocMemCache lives in each worker process, so a write would only invalidate the cache of
+# the worker that served it and the others would keep serving stale pages
+case "${DJANGO_SERVER:-uvicorn}" in
+    runserver|daphne) ;;
+    *)
+        if [ "$(echo "${NOTES_CACHE:-off}" | tr '[:upper:]' '[:lower:]')" = "memory" ] && [ "$WEB_CONCURRENCY" -gt 1 ]; then
+            echo "NOTES_CACHE=memory needs WEB_CONCURRENCY=1, use NOTES_CACHE=redis for $WEB_CONCURRENCY workers"
+            exit 1
+        fi
+        ;;
+esac
+
+# DJANGO_SERVER selects how benchmark.asgi is served: uvicorn (default), daphne or runserver
+case "${DJANGO_SERVER:-uvicorn}" in
+    runserver)
+        (trap 'kill 0' SIGINT; python manage.py runserver 0.0.0.0:8000 & wait)
+        ;;
+    daphne)
+        # daphne has no worker pool of its own, so it always runs a single process
+        (trap 'kill 0' SIGINT; daphne --bind 0.0.0.0 --port 8000 benchmark.asgi:application & wait)
+        ;;
+    uvicorn)
+        (trap 'kill 0' SIGINT; gunicorn benchmark.asgi:application --bind 0.0.0.0:8000 --workers "$WEB_CONCURRENCY" --worker-class uvicorn.workers.UvicornWorker & wait)
+        ;;
+    *)
+        echo "Unsupported DJANGO_SERVER '$DJANGO_SERVER', expected uvicorn, daphne or runserver"
+        exit 1
+        ;;
+esac
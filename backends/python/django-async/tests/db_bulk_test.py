@@ -0,0 +1,6 @@
+from locust_common.workload import DbBulkTestUser, Route
+
+
+class NoteUser(DbBulkTestUser):
+    create_notes = Route('POST', '/api/notes/bulk/', expected=(201,))
+    list_notes = Route('GET', '/api/notes/')
@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -23,8 +25,13 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = 'django-insecure-e-wdr4aryz5*#hiwn13p)*8*(9srudto+es-@e^%6xdo)(y1bf'
 
+# DJANGO_PROFILE=lean strips the app/middleware stack down to what the notes API
+# uses and disables DEBUG; "default" keeps the startproject configuration
+DJANGO_PROFILE = os.getenv('DJANGO_PROFILE', 'default').lower()
+LEAN_PROFILE = DJANGO_PROFILE == 'lean'
+
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = not LEAN_PROFILE
 
 ALLOWED_HOSTS = ['*']
 
@@ -52,6 +59,13 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+if LEAN_PROFILE:
+    INSTALLED_APPS = [
+        'rest_framework',
+        'notes',
+    ]
+    MIDDLEWARE = []
+
 ROOT_URLCONF = 'benchmark.urls'
 
 TEMPLATES = [
@@ -69,6 +83,8 @@ TEMPLATES = [
         },
     },
 ]
+if LEAN_PROFILE:
+    TEMPLATES[0]['OPTIONS']['context_processors'] = []
 
 WSGI_APPLICATION = 'benchmark.wsgi.application'
 
@@ -88,6 +104,67 @@ DATABASES={
    
 }
 
+# DATABASE_CONNECTIONS selects how connections are managed:
+#   "per-request" - a new connection per request, pooled by pgbouncer in transaction mode
+#   "persistent"  - reuse connections for CONN_MAX_AGE seconds with health checks
+#   "pool"        - Django 5.1+ native psycopg 3 pool (point DATABASE_HOST at db directly)
+DATABASE_CONNECTIONS = os.getenv('DATABASE_CONNECTIONS', 'per-request').lower()
+if DATABASE_CONNECTIONS == 'persistent':
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('CONN_MAX_AGE', '600'))
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+elif DATABASE_CONNECTIONS == 'pool':
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.getenv('DATABASE_POOL_MIN_SIZE', '4')),
+            'max_size': int(os.getenv('DATABASE_POOL_MAX_SIZE', '16')),
+            'timeout': int(os.getenv('DATABASE_POOL_TIMEOUT', '30')),
+        },
+    }
+elif DATABASE_CONNECTIONS != 'per-request':
+    raise ImproperlyConfigured(
+        f"Unsupported DATABASE_CONNECTIONS '{DATABASE_CONNECTIONS}', expected per-request, persistent or pool")
+# Server-side cursors do not survive pgbouncer transaction pooling
+DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+# Read-through cache for the notes list endpoint
+# NOTES_CACHE is "off", "memory" (LocMemCache, one cache per worker process, so only
+# correct with a single worker, which run_only_for_docker.sh enforces) or "redis"
+NOTES_CACHE = os.getenv('NOTES_CACHE', 'off').lower()
+NOTES_CACHE_TTL = float(os.getenv('NOTES_CACHE_TTL', '5'))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'TIMEOUT': NOTES_CACHE_TTL,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('NOTES_CACHE_MAX_ENTRIES', '1024')),
+        },
+    }
+}
+if NOTES_CACHE == 'redis':
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL', 'redis://redis:6379'),
+        'TIMEOUT': NOTES_CACHE_TTL,
+    }
+
+# "orjson" renders the notes API with orjson and lists rows via .values(),
+# skipping per-row serializer work on GET /api/notes/
+NOTES_SERIALIZER = os.getenv('NOTES_SERIALIZER', 'drf').lower()
+
+if LEAN_PROFILE:
+    # JSON only, no browsable API, and no authentication or permission checks
+    REST_FRAMEWORK = {
+        'DEFAULT_RENDERER_CLASSES': [
+            'notes.renderers.ORJSONRenderer' if NOTES_SERIALIZER == 'orjson'
+            else 'rest_framework.renderers.JSONRenderer',
+        ],
+        'DEFAULT_PARSER_CLASSES': ['rest_framework.parsers.JSONParser'],
+        'DEFAULT_AUTHENTICATION_CLASSES': [],
+        'DEFAULT_PERMISSION_CLASSES': [],
+        'UNAUTHENTICATED_USER': None,
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -14,6 +14,7 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
@@ -22,8 +23,9 @@ def home(request):
     return HttpResponse('Benchmark')
 urlpatterns = [
     path('', home),
-    path('admin/', admin.site.urls),
     path('api/', include('notes.urls')),
 
 ]
+if 'django.contrib.admin' in settings.INSTALLED_APPS:
+    urlpatterns.append(path('admin/', admin.site.urls))
 
@@ -2,15 +2,76 @@ from django.shortcuts import render
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
+from django.conf import settings
+from rest_framework.settings import api_settings
+
+from . import cache as notes_cache
 from .models import Note
+from .renderers import ORJSONRenderer
 from .serializers import NoteSerializer
 
+# Ordered by primary key so pages are deterministic; the after_id cursor turns
+# deep pages into an index range scan instead of an ever-growing offset.
+def notes_page(request):
+    queryset = Note.objects.order_by('pk')
+    after_id = request.query_params.get('after_id')
+    if after_id is not None:
+        try:
+            after_id = int(after_id)
+        except ValueError:
+            raise ValidationError({'after_id': 'A valid integer is required.'})
+        queryset = queryset.filter(pk__gt=after_id)
+    return queryset[:100]
+
+
+FAST_SERIALIZATION = settings.NOTES_SERIALIZER == 'orjson'
+NOTE_FIELDS = ('id', 'title', 'content')
+
+
 class NoteViewSet(viewsets.ModelViewSet):
     queryset = Note.objects.all()
     serializer_class = NoteSerializer
+    renderer_classes = [ORJSONRenderer] if FAST_SERIALIZATION else api_settings.DEFAULT_RENDERER_CLASSES
     
     def get_queryset(self):
-        return Note.objects.all()[:100]
+        return notes_page(self.request)
+
+    def list(self, request, *args, **kwargs):
+        key, data = notes_cache.lookup(request)
+        if data is None:
+            if FAST_SERIALIZATION:
+                data = list(self.get_queryset().values(*NOTE_FIELDS))
+            else:
+                data = super().list(request, *args, **kwargs).data
+            notes_cache.store(key, data)
+        return Response(data)
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        notes_cache.invalidate()
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        notes_cache.invalidate()
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        notes_cache.invalidate()
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        serializer = NoteSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        # A single multi-row INSERT ... RETURNING for the whole batch
+        notes = Note.objects.bulk_create(
+            [Note(**item) for item in serializer.validated_data])
+        notes_cache.invalidate()
+        return Response(NoteSerializer(notes, many=True).data, status=201)
+
+    @action(detail=False, methods=['get'])
+    def cache_stats(self, request):
+        return Response(notes_cache.stats())
 
     @action(detail=False, methods=['get'])
     def no_db_endpoint(self, request):
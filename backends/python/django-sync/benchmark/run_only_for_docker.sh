@@ -1,4 +1,38 @@
 cd "${0%/*}"
 python manage.py makemigrations
 python manage.py migrate
-(trap 'kill 0' SIGINT; python manage.py runserver 0.0.0.0:8000 & wait)
\ No newline at end of file
+
+# Derive the worker count from the container CPU limit unless it is set explicitly
+if [ -z "$WEB_CONCURRENCY" ]; then
+    cpu_limit=$(python -c "import math, os; print(max(1, math.ceil(float(os.getenv('SERVICE_CPU_CORE_LIMIT') or 1))))")
+    export WEB_CONCURRENCY=$((cpu_limit * 2 + 1))
+fi
+
+# LocMemCache lives in each worker process, so a write would only invalidate the cache of
+# the worker that served it and the others would keep serving stale pages
+case "${DJANGO_SERVER:-gunicorn}" in
+    runserver) ;;
+    *)
+        if [ "$(echo "${NOTES_CACHE:-off}" | tr '[:upper:]' '[:lower:]')" = "memory" ] && [ "$WEB_CONCURRENCY" -gt 1 ]; then
+            echo "NOTES_CACHE=memory needs WEB_CONCURRENCY=1, use NOTES_CACHE=redis for $WEB_CONCURRENCY workers"
+            exit 1
+        fi
+        ;;
+esac
+
+# DJANGO_SERVER selects how benchmark.wsgi is served: gunicorn (default), gthread or runserver
+case "${DJANGO_SERVER:-gunicorn}" in
+    runserver)
+        (trap 'kill 0' SIGINT; python manage.py runserver 0.0.0.0:8000 & wait)
+        ;;
+    gthread)
+        (trap 'kill 0' SIGINT; gunicorn benchmark.wsgi:application --bind 0.0.0.0:8000 --workers "$WEB_CONCURRENCY" --worker-class gthread --threads "${GUNICORN_THREADS:-4}" & wait)
+        ;;
+    gunicorn)
+        (trap 'kill 0' SIGINT; gunicorn benchmark.wsgi:application --bind 0.0.0.0:8000 --workers "$WEB_CONCURRENCY" --worker-class sync & wait)
+        ;;
+    *)
+        echo "Unsupported DJANGO_SERVER '$DJANGO_SERVER', expected gunicorn, gthread or runserver"
+        exit 1
+        ;;
+esac
@@ -1,15 +1,6 @@
-from locust import FastHttpUser, task, between
+from locust_common.workload import DbTestUser, Route
 
-class NoteUser(FastHttpUser):
-    # wait_time = between(1, 2)
 
-    @task
-    def write_note(self):
-        self.client.post("/api/notes/", json={
-            "title": "Sample Note",
-            "content": "This is a note content."
-        })
-
-    @task
-    def read_notes(self):
-        self.client.get("/api/notes/")
+class NoteUser(DbTestUser):
+    create_note = Route('POST', '/api/notes/', expected=(201,))
+    list_notes = Route('GET', '/api/notes/')
@@ -1,13 +1,6 @@
-from locust import FastHttpUser, task, between
+from locust_common.workload import NoDbTestUser, Route
 
-class NoteUser(FastHttpUser):
-    # wait_time = between(1, 2)
 
-
-    @task
-    def no_db_endpoint(self):
-        self.client.get("/api/notes/no_db_endpoint/")
-
-    @task
-    def no_db_endpoint2(self):
-        self.client.get("/api/notes/no_db_endpoint2/")
\ No newline at end of file
+class NoteUser(NoDbTestUser):
+    no_db_endpoint = Route('GET', '/api/notes/no_db_endpoint/')
+    no_db_endpoint2 = Route('GET', '/api/notes/no_db_endpoint2/')
@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# "memory" enables the in-process read-through cache for GET /api/notes/, "off" disables it
+NOTES_CACHE = os.getenv('NOTES_CACHE', 'off').lower()
+if NOTES_CACHE not in ('off', 'memory'):
+    raise ValueError(f"Unsupported NOTES_CACHE '{NOTES_CACHE}', expected 'off' or 'memory'")
+NOTES_CACHE_TTL = float(os.getenv('NOTES_CACHE_TTL', '5'))
+NOTES_CACHE_MAX_ENTRIES = int(os.getenv('NOTES_CACHE_MAX_ENTRIES', '1024'))
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries also expire after ``ttl`` seconds.
+
+    Writes bump ``version`` instead of clearing the cache: keys built by
+    ``key()`` embed the version, so stale pages are never looked up again and
+    age out through LRU eviction.
+    """
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, *parts):
+        return (self.version, *parts)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        with self._lock:
+            self.version += 1
+            self.invalidations += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': NOTES_CACHE,
+            'pid': os.getpid(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'invalidations': self.invalidations,
+            'entries': len(self._entries),
+            'version': self.version,
+        }
+
+
+notes_cache = TTLCache(NOTES_CACHE_MAX_ENTRIES, NOTES_CACHE_TTL) if NOTES_CACHE == 'memory' else None
+
+
+def lookup(*parts):
+    # Returns the cache key and the cached value, (None, None) when caching is off
+    if notes_cache is None:
+        return None, None
+    key = notes_cache.key(*parts)
+    return key, notes_cache.get(key)
+
+
+def store(key, value):
+    if notes_cache is not None:
+        notes_cache.set(key, value)
+
+
+def invalidate():
+    if notes_cache is not None:
+        notes_cache.invalidate()
+
+
+def stats():
+    if notes_cache is None:
+        return {'backend': NOTES_CACHE}
+    return notes_cache.stats()
@@ -1,12 +1,73 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
 import models, schemas
 
-def get_notes(db: Session, skip: int = 0, limit: int = 10):
-    return db.query(models.Note).offset(skip).limit(limit).all()
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+NOTE_COLUMNS = (models.Note.id, models.Note.title, models.Note.content)
+
+def notes_query(skip: int = 0, limit: int = 10, after_id: int | None = None, columns=None):
+    # Ordering by the primary key keeps pages deterministic; after_id turns the
+    # offset scan into an index range scan whose cost does not grow with depth.
+    query = select(*columns) if columns else select(models.Note)
+    query = query.order_by(models.Note.id)
+    if after_id is not None:
+        query = query.where(models.Note.id > after_id)
+    else:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+def insert_notes_query():
+    # One INSERT ... RETURNING round-trip; the response is built from the returned
+    # row so no refresh SELECT is needed. Executed with a list of parameter sets,
+    # SQLAlchemy batches it into multi-row INSERT ... VALUES (...), (...) RETURNING.
+    return insert(models.Note).returning(*NOTE_COLUMNS, sort_by_parameter_order=True)
+
+def note_params(note: schemas.NoteCreate):
+    return {"title": note.title, "content": note.content}
+
+def get_notes(db: Session, skip: int = 0, limit: int = 10, after_id: int | None = None):
+    return db.execute(notes_query(skip, limit, after_id)).scalars().all()
+
+def get_note_rows(db: Session, skip: int = 0, limit: int = 10, after_id: int | None = None):
+    # Plain (id, title, content) tuples, skipping ORM instance construction
+    return db.execute(notes_query(skip, limit, after_id, NOTE_COLUMNS)).all()
 
 def create_note(db: Session, note: schemas.NoteCreate):
-    db_note = models.Note(title=note.title, content=note.content)
-    db.add(db_note)
+    row = db.execute(insert_notes_query(), note_params(note)).one()
+    db.commit()
+    return row._asdict()
+
+def create_notes(db: Session, notes: list[schemas.NoteCreate]):
+    if not notes:
+        return []
+    rows = db.execute(insert_notes_query(), [note_params(note) for note in notes]).all()
     db.commit()
-    db.refresh(db_note)
-    return db_note
+    return [row._asdict() for row in rows]
+
+async def get_notes_async(db: AsyncSession, skip: int = 0, limit: int = 10, after_id: int | None = None):
+    result = await db.execute(notes_query(skip, limit, after_id))
+    return result.scalars().all()
+
+async def get_note_rows_async(db: AsyncSession, skip: int = 0, limit: int = 10, after_id: int | None = None):
+    result = await db.execute(notes_query(skip, limit, after_id, NOTE_COLUMNS))
+    return result.all()
+
+async def create_note_async(db: AsyncSession, note: schemas.NoteCreate):
+    result = await db.execute(insert_notes_query(), note_params(note))
+    row = result.one()
+    await db.commit()
+    return row._asdict()
+
+async def create_notes_async(db: AsyncSession, notes: list[schemas.NoteCreate]):
+    if not notes:
+        return []
+    result = await db.execute(insert_notes_query(), [note_params(note) for note in notes])
+    rows = result.all()
+    await db.commit()
+    return [row._asdict() for row in rows]
@@ -3,7 +3,15 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-DATABASE_URL = f"postgresql://{os.getenv('DATABASE_USER')}:{os.getenv('DATABASE_PASSWORD')}@{os.getenv('DATABASE_HOST')}:5432/{os.getenv('DATABASE_NAME')}"
+DATABASE_CREDENTIALS = f"{os.getenv('DATABASE_USER')}:{os.getenv('DATABASE_PASSWORD')}@{os.getenv('DATABASE_HOST')}:5432/{os.getenv('DATABASE_NAME')}"
+DATABASE_URL = f"postgresql://{DATABASE_CREDENTIALS}"
+ASYNC_DATABASE_URL = f"postgresql+asyncpg://{DATABASE_CREDENTIALS}"
+
+# "sync" keeps the psycopg2 engine, "async" serves requests through asyncpg
+DATABASE_MODE = os.getenv('DATABASE_MODE', 'sync').lower()
+if DATABASE_MODE not in ('sync', 'async'):
+    raise ValueError(f"Unsupported DATABASE_MODE '{DATABASE_MODE}', expected 'sync' or 'async'")
+ASYNC_MODE = DATABASE_MODE == 'async'
 
 engine = create_engine(
     DATABASE_URL,
@@ -12,5 +20,20 @@ engine = create_engine(
     pool_timeout=30,  # Set pool timeout
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 Base = declarative_base()
+
+async_engine = None
+AsyncSessionLocal = None
+if ASYNC_MODE:
+    # Imported only in async mode so the sync service does not need greenlet
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_size=20,
+        max_overflow=30,
+        pool_timeout=30,
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False)
@@ -1,13 +1,22 @@
+import os
 import uvicorn
 from fastapi import FastAPI, Depends, HTTPException
 from sqlalchemy.orm import Session
-from database import SessionLocal, engine
-from fastapi.responses import PlainTextResponse
+from database import ASYNC_MODE, AsyncSessionLocal, SessionLocal, engine
+from fastapi.responses import PlainTextResponse, Response
 
-import crud, models, schemas
+import cache, crud, models, schemas
 
 models.Base.metadata.create_all(bind=engine)
 
+# "orjson" encodes GET /api/notes/ rows straight to JSON bytes, bypassing schemas.Note validation
+NOTES_SERIALIZER = os.getenv('NOTES_SERIALIZER', 'pydantic').lower()
+if NOTES_SERIALIZER not in ('pydantic', 'orjson'):
+    raise ValueError(f"Unsupported NOTES_SERIALIZER '{NOTES_SERIALIZER}', expected 'pydantic' or 'orjson'")
+FAST_SERIALIZATION = NOTES_SERIALIZER == 'orjson'
+if FAST_SERIALIZATION:
+    import orjson
+
 app = FastAPI()
 
 # Dependency
@@ -18,14 +27,71 @@ def get_db():
     finally:
         db.close()
 
-@app.post("/api/notes/", response_model=schemas.Note)
-async def create_note(note: schemas.NoteCreate, db: Session = Depends(get_db)):
-    return crud.create_note(db=db, note=note)
+def encode_note_rows(rows):
+    return orjson.dumps([{"id": id, "title": title, "content": content} for id, title, content in rows])
 
-@app.get("/api/notes/", response_model=list[schemas.Note])
-async def read_notes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    notes = crud.get_notes(db, skip=skip, limit=limit)
+def notes_response(notes):
+    # In orjson mode the cached value is already the encoded body
+    if FAST_SERIALIZATION:
+        return Response(content=notes, media_type="application/json")
     return notes
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+if ASYNC_MODE:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    @app.post("/api/notes/", response_model=schemas.Note)
+    async def create_note(note: schemas.NoteCreate, db: AsyncSession = Depends(get_async_db)):
+        created = await crud.create_note_async(db=db, note=note)
+        cache.invalidate()
+        return created
+
+    @app.post("/api/notes/bulk", response_model=list[schemas.Note])
+    async def create_notes(notes: list[schemas.NoteCreate], db: AsyncSession = Depends(get_async_db)):
+        created = await crud.create_notes_async(db=db, notes=notes)
+        cache.invalidate()
+        return created
+
+    @app.get("/api/notes/", response_model=list[schemas.Note])
+    async def read_notes(skip: int = 0, limit: int = 100, after_id: int | None = None, db: AsyncSession = Depends(get_async_db)):
+        key, notes = cache.lookup(skip, limit, after_id)
+        if notes is None:
+            if FAST_SERIALIZATION:
+                notes = encode_note_rows(await crud.get_note_rows_async(db, skip=skip, limit=limit, after_id=after_id))
+            else:
+                notes = await crud.get_notes_async(db, skip=skip, limit=limit, after_id=after_id)
+            cache.store(key, notes)
+        return notes_response(notes)
+else:
+    @app.post("/api/notes/", response_model=schemas.Note)
+    async def create_note(note: schemas.NoteCreate, db: Session = Depends(get_db)):
+        created = crud.create_note(db=db, note=note)
+        cache.invalidate()
+        return created
+
+    @app.post("/api/notes/bulk", response_model=list[schemas.Note])
+    async def create_notes(notes: list[schemas.NoteCreate], db: Session = Depends(get_db)):
+        created = crud.create_notes(db=db, notes=notes)
+        cache.invalidate()
+        return created
+
+    @app.get("/api/notes/", response_model=list[schemas.Note])
+    async def read_notes(skip: int = 0, limit: int = 100, after_id: int | None = None, db: Session = Depends(get_db)):
+        key, notes = cache.lookup(skip, limit, after_id)
+        if notes is None:
+            if FAST_SERIALIZATION:
+                notes = encode_note_rows(crud.get_note_rows(db, skip=skip, limit=limit, after_id=after_id))
+            else:
+                notes = crud.get_notes(db, skip=skip, limit=limit, after_id=after_id)
+            cache.store(key, notes)
+        return notes_response(notes)
+
+@app.get("/api/notes/cache_stats/")
+async def cache_stats():
+    return cache.stats()
 @app.get("/", response_class=PlainTextResponse)
 def read_root():
     return "notes api"
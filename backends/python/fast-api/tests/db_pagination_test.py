@@ -0,0 +1,6 @@
+from locust_common.workload import DbPaginationTestUser, Route
+
+
+class NoteUser(DbPaginationTestUser):
+    create_note = Route('POST', '/api/notes/', expected=(200,))
+    list_notes = Route('GET', '/api/notes/?after_id={after_id}')
@@ -1,15 +1,6 @@
-from locust import FastHttpUser, task
+from locust_common.workload import NoDbTestUser, Route
 
-class NoteUser(FastHttpUser):
 
-    @task
-    def no_db_endpoint(self):
-        with self.client.get("/no_db_endpoint/", catch_response=True) as response:
-            if response.status_code != 200:
-                response.failure(f"Unexpected status code: {response.status_code}. Response: {response.text}")
-
-    @task
-    def no_db_endpoint2(self):
-        with self.client.get("/no_db_endpoint2/", catch_response=True) as response:
-            if response.status_code != 200:
-                response.failure(f"Unexpected status code: {response.status_code}. Response: {response.text}")
+class NoteUser(NoDbTestUser):
+    no_db_endpoint = Route('GET', '/no_db_endpoint/')
+    no_db_endpoint2 = Route('GET', '/no_db_endpoint2/')
@@ -95,9 +95,24 @@ const getColor = (serviceName) => {
   return colorPalette.gray; // Default to gray if no pattern matches
 };
 
+// --- Sidebar Label: the service name without its test type ---
+// db_pagination_test and db_bulk_test are listed with db_test, so they keep theirs
+const serviceLabel = (serviceName, testType) => {
+  const name = serviceName.replace(testType, "").trim();
+  return testType === "db_test" || testType === "no_db_test"
+    ? name
+    : `${name} (${testType})`;
+};
+
 // --- Theme Context ---
 const ThemeContext = React.createContext();
 
+// --- Base URL of the published data (GitHub Pages serves the app under /backend-benchmark) ---
+const getBaseURL = () =>
+  window.location.pathname.includes("backend-benchmark")
+    ? "/backend-benchmark"
+    : "";
+
 function ImprovedBenchmarkApp() {
   const [data, setData] = useState({});
   const [selectedServices, setSelectedServices] = useState([]);
@@ -118,14 +133,13 @@ function ImprovedBenchmarkApp() {
   };
 
   // --- Data Fetching with Error Handling and Partial Loading ---
+  // Only the index (service summaries and shard paths) is fetched up front,
+  // each service's time series is fetched when the service is first selected.
   useEffect(() => {
-    const baseURL = window.location.pathname.includes("backend-benchmark")
-      ? "/backend-benchmark"
-      : "";
     const source = axios.CancelToken.source();
 
     axios
-      .get(`${baseURL}/data.json`, {
+      .get(`${getBaseURL()}/data/index.json`, {
         cancelToken: source.token,
         onDownloadProgress: (progressEvent) => {
           if (progressEvent.total > 0) {
@@ -137,7 +151,7 @@ function ImprovedBenchmarkApp() {
         },
       })
       .then((response) => {
-        setData(response.data);
+        setData(response.data.services);
         setLoading(false);
       })
       .catch((error) => {
@@ -151,8 +165,34 @@ function ImprovedBenchmarkApp() {
     // };
   }, []);
 
+  // --- Lazy Loading of a Service's Column-Oriented Data Shard ---
+  const loadServiceData = (service) => {
+    if (!data[service] || data[service].columns || data[service].error) {
+      return;
+    }
+    axios
+      .get(`${getBaseURL()}/${data[service].shard}`)
+      .then((response) => {
+        setData((prev) => ({
+          ...prev,
+          [service]: { ...prev[service], columns: response.data.columns },
+        }));
+      })
+      .catch((error) => {
+        console.error(`Error fetching data for ${service}:`, error);
+        toast.error(`Failed to fetch data for ${service}`);
+        setData((prev) => ({
+          ...prev,
+          [service]: { ...prev[service], error: true },
+        }));
+      });
+  };
+
   // --- Selection Handlers with Checkboxes ---
   const handleServiceChange = (service) => {
+    if (!selectedServices.includes(service)) {
+      loadServiceData(service);
+    }
     setSelectedServices((prev) => {
       const updatedServices = prev.includes(service)
         ? prev.filter((s) => s !== service)
@@ -175,7 +215,9 @@ function ImprovedBenchmarkApp() {
       setAllFieldsSelected(!allFieldsSelected);
       if (!allFieldsSelected) {
         // Select all fields
-        const allFields = Object.keys(data[selectedServices[0]].data[0]).filter(
+        const allFields = Object.keys(
+          data[selectedServices[0]]?.columns || {}
+        ).filter(
           (f) =>
             ![
               "timestamp",
@@ -203,10 +245,12 @@ function ImprovedBenchmarkApp() {
   // --- Memoized Chart Data Generation with Smoothing ---
   const generateChartDataForField = useMemo(() => {
     return (field) => {
-      const datasets = selectedServices
-        .filter((service) => !data[service]?.error) // Exclude services with errors
+      const loadedServices = selectedServices.filter(
+        (service) => !data[service]?.error && data[service]?.columns
+      ); // Exclude services with errors or whose shard is still loading
+      const datasets = loadedServices
         .map((service) => {
-          const rawData = data[service].data.map((item) => item[field]);
+          const rawData = data[service].columns[field] || [];
           const smoothedData = smoothData(rawData);
 
           return {
@@ -223,9 +267,10 @@ function ImprovedBenchmarkApp() {
           };
         });
 
-      const labels = data[selectedServices[0]].data.map(
-        (item) => item.Timestamp
-      );
+      const labels =
+        loadedServices.length > 0
+          ? data[loadedServices[0]].columns.Timestamp
+          : [];
 
       return { labels, datasets };
     };
@@ -458,8 +503,7 @@ function ImprovedBenchmarkApp() {
                           {Object.keys(data)
                             .filter(
                               (service) =>
-                                service.includes("db_test") &&
-                                !service.includes("no_db_test")
+                                data[service].test_type !== "no_db_test"
                             )
                             .map((service) => (
                               <div
@@ -514,10 +558,10 @@ function ImprovedBenchmarkApp() {
                                   }}
                                 >
                                   {/* Text label */}
-                                  {service
-                                    .replace("no_db_test", "")
-                                    .replace("db_test", "")
-                                    .trim()}
+                                  {serviceLabel(
+                                    service,
+                                    data[service].test_type
+                                  )}
                                 </span>
                               </div>
                             ))}
@@ -571,7 +615,10 @@ function ImprovedBenchmarkApp() {
                       {noDbServicesExpanded && (
                         <div className="options">
                           {Object.keys(data)
-                            .filter((service) => service.includes("no_db_test"))
+                            .filter(
+                              (service) =>
+                                data[service].test_type === "no_db_test"
+                            )
                             .map((service) => (
                               <div
                                 key={service}
@@ -622,10 +669,10 @@ function ImprovedBenchmarkApp() {
                                   }}
                                 >
                                   {/* Text label */}
-                                  {service
-                                    .replace("no_db_test", "")
-                                    .replace("db_test", "")
-                                    .trim()}
+                                  {serviceLabel(
+                                    service,
+                                    data[service].test_type
+                                  )}
                                 </span>
                               </div>
                             ))}
@@ -704,7 +751,7 @@ function ImprovedBenchmarkApp() {
 
                     {/* Individual Field Checkboxes */}
                     {selectedServices.length > 0 &&
-                      Object.keys(data[selectedServices[0]]?.data[0] || {})
+                      Object.keys(data[selectedServices[0]]?.columns || {})
                         .filter(
                           (field) =>
                             ![
@@ -0,0 +1,6 @@
+"""Helpers shared by the Locust test files of every backend.
+
+The package is mounted at /mnt/locust_common in the tester containers and
+imported from the test files; importing it registers the event listeners.
+"""
+from locust_common import histogram, open_model, shapes  # noqa: F401
@@ -0,0 +1,82 @@
+"""Records Locust's full response-time distribution next to the CSV stats.
+
+Locust only exports a handful of percentiles per interval, which cannot be
+combined into run-wide tail latencies. Every HISTOGRAM_INTERVAL seconds the
+master (or a standalone runner) appends the new entries of each endpoint's
+response-time histogram to response_time_histogram.csv:
+
+    timestamp,method,name,response_time_ms,count
+
+so the graph generator can merge any time window into exact percentiles,
+within Locust's own bucketing (1 ms below 100 ms, then 2 significant digits).
+"""
+import csv
+import os
+import time
+
+import gevent
+from locust import events
+from locust.runners import WorkerRunner
+
+HISTOGRAM_FILE = os.getenv('HISTOGRAM_FILE', 'response_time_histogram.csv')
+HISTOGRAM_INTERVAL = float(os.getenv('HISTOGRAM_INTERVAL', '1'))
+
+
+class HistogramRecorder:
+    # Writes the histograms of environment.stats, or of another RequestStats such as the
+    # coordinated-omission corrected one kept by open_model
+    def __init__(self, environment, path=HISTOGRAM_FILE, interval=HISTOGRAM_INTERVAL, stats=None):
+        self.environment = environment
+        self.stats = stats
+        self.path = path
+        self.interval = interval
+        self._previous = {}
+        self._file = None
+        self._writer = None
+        self._greenlet = None
+
+    def start(self):
+        if self._greenlet is not None:
+            return
+        self._previous = {}
+        self._file = open(self.path, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(['timestamp', 'method', 'name', 'response_time_ms', 'count'])
+        self._greenlet = gevent.spawn(self._run)
+
+    def stop(self):
+        if self._greenlet is None:
+            return
+        self._greenlet.kill(block=True)
+        self._greenlet = None
+        self.flush()
+        self._file.close()
+
+    def _run(self):
+        while True:
+            gevent.sleep(self.interval)
+            self.flush()
+
+    def flush(self):
+        # Only the counts added since the previous flush are written
+        timestamp = int(time.time())
+        stats = self.stats if self.stats is not None else self.environment.stats
+        for (name, method), entry in list(stats.entries.items()):
+            previous = self._previous.setdefault((name, method), {})
+            for response_time, count in list(entry.response_times.items()):
+                delta = count - previous.get(response_time, 0)
+                if delta > 0:
+                    self._writer.writerow([timestamp, method, name, response_time, delta])
+                    previous[response_time] = count
+        self._file.flush()
+
+
+@events.init.add_listener
+def on_init(environment, **kwargs):
+    # Workers report to the master, whose stats already hold the merged histograms
+    if isinstance(environment.runner, WorkerRunner):
+        return
+    recorder = HistogramRecorder(environment)
+    environment.events.test_start.add_listener(lambda **_: recorder.start())
+    # Workers send their last report after test_stop, so the final flush waits for quitting
+    environment.events.quitting.add_listener(lambda **_: recorder.stop())
@@ -0,0 +1,115 @@
+"""Open-model load: requests are sent on a fixed schedule instead of back to back.
+
+With the default closed model (LOAD_MODEL=closed) every user sends its next request as
+soon as the previous one returns, so a stalled server also stalls the load and the
+stall never shows in the latencies (coordinated omission). With LOAD_MODEL=open each
+user sends one task every OPEN_MODEL_USERS / TARGET_RPS seconds on a fixed timeline,
+so all users together aim for TARGET_RPS requests/s once they are spawned. A user that
+falls behind sends its late requests immediately and keeps the original timeline.
+
+The intended send time of each task is put in the request context. For every request
+the lag between its intended and actual send time is added to its response time, and
+the corrected latencies are kept in their own stats, next to a "send lag" entry:
+
+    corrected_response_time_histogram.csv   (same columns as response_time_histogram.csv)
+
+Locust's own stats still hold the uncorrected response times. Each task is expected to
+send a single request, which is what every tests/ file does.
+"""
+import os
+import random
+import time
+
+from locust import events
+from locust.runners import MasterRunner, WorkerRunner
+from locust.stats import RequestStats, StatsEntry
+
+from locust_common.histogram import HistogramRecorder
+
+LOAD_MODEL = os.getenv('LOAD_MODEL', 'closed')
+TARGET_RPS = float(os.getenv('TARGET_RPS') or 0)
+# Users the rate is spread over, the tester's --users
+OPEN_MODEL_USERS = int(os.getenv('OPEN_MODEL_USERS') or 0)
+CORRECTED_HISTOGRAM_FILE = os.getenv('CORRECTED_HISTOGRAM_FILE', 'corrected_response_time_histogram.csv')
+# Method and name of the stats entry holding how late requests were sent
+SEND_LAG_METHOD = 'SCHEDULE'
+SEND_LAG_NAME = 'send lag'
+# Key of the corrected stats in the worker reports
+REPORT_KEY = 'open_model_stats'
+
+if LOAD_MODEL not in ('closed', 'open'):
+    raise ValueError(f"LOAD_MODEL must be 'closed' or 'open', got {LOAD_MODEL!r}")
+if LOAD_MODEL == 'open' and (TARGET_RPS <= 0 or OPEN_MODEL_USERS <= 0):
+    raise ValueError('LOAD_MODEL=open needs TARGET_RPS and OPEN_MODEL_USERS')
+
+
+def open_model_pacing(period):
+    # Wait time function keeping a user on its own timeline of one task per period; the first
+    # slot is offset at random so the users do not send in bursts
+    def wait_time(user):
+        now = time.time()
+        intended = getattr(user, '_intended_start', None)
+        if intended is None:
+            intended = now + random.uniform(0, period)
+        else:
+            intended += period
+        user._intended_start = intended
+        return max(intended - now, 0)
+
+    return wait_time
+
+
+def with_intended_start(context):
+    def context_with_intended_start(user):
+        return {**context(user), 'intended_start': getattr(user, '_intended_start', None)}
+
+    return context_with_intended_start
+
+
+def merge_reports(stats, reports):
+    # Same merge as Locust does for its own stats in the worker reports
+    for report in reports:
+        entry = StatsEntry.unserialize(report, stats)
+        key = (entry.name, entry.method)
+        if key not in stats.entries:
+            stats.entries[key] = StatsEntry(stats, entry.name, entry.method, use_response_times_cache=True)
+        stats.entries[key].extend(entry)
+
+
+@events.init.add_listener
+def on_init(environment, **kwargs):
+    if LOAD_MODEL != 'open':
+        return
+    period = OPEN_MODEL_USERS / TARGET_RPS
+    for user_class in environment.user_classes:
+        user_class.wait_time = open_model_pacing(period)
+        user_class.context = with_intended_start(user_class.context)
+
+    stats = RequestStats()
+
+    if not isinstance(environment.runner, MasterRunner):
+        @environment.events.request.add_listener
+        def on_request(request_type, name, response_time, response_length, context, start_time=None,
+                       exception=None, **kwargs):
+            if response_time is None:
+                return
+            # A user's first task runs as soon as it is spawned, before it has a timeline
+            intended = (context or {}).get('intended_start')
+            lag = max(start_time - intended, 0) * 1000 if intended is not None and start_time else 0
+            stats.get(name, request_type).log(round(response_time + lag), response_length or 0)
+            stats.get(SEND_LAG_NAME, SEND_LAG_METHOD).log(round(lag), 0)
+
+    if isinstance(environment.runner, WorkerRunner):
+        @environment.events.report_to_master.add_listener
+        def on_report_to_master(client_id, data, **kwargs):
+            data[REPORT_KEY] = stats.serialize_stats()
+        return
+
+    if isinstance(environment.runner, MasterRunner):
+        @environment.events.worker_report.add_listener
+        def on_worker_report(client_id, data, **kwargs):
+            merge_reports(stats, data.get(REPORT_KEY, []))
+
+    recorder = HistogramRecorder(environment, path=CORRECTED_HISTOGRAM_FILE, stats=stats)
+    environment.events.test_start.add_listener(lambda **_: recorder.start())
+    environment.events.quitting.add_listener(lambda **_: recorder.stop())
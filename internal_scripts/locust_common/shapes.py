@@ -0,0 +1,119 @@
+"""Load profiles selected with LOAD_PROFILE, shared by every backend's tests.
+
+ramp (default)  Locust's own linear ramp from --spawn-rate to --users, no shape.
+step            LOAD_STEPS equal plateaus from --users / LOAD_STEPS up to --users.
+spike           A baseline of SPIKE_BASELINE * --users, a jump to --users, then back to
+                the baseline to show how the service recovers.
+soak            A short ramp to SOAK_LEVEL * --users held for the rest of the run.
+
+Every profile is spread over --run-time, so LOCUST_USERS and LOCUST_RUNTIME keep their
+meaning. With LOAD_MODEL=open the request rate follows the user count, which turns a
+profile into a requests/s schedule. The master (or a standalone runner) writes the
+planned stages to stages.csv when the test starts:
+
+    stage,start,end,users
+
+with start and end in epoch seconds, for the per-stage summaries of the graph generator.
+"""
+import csv
+import os
+import time
+from dataclasses import dataclass
+
+from locust import LoadTestShape, events
+from locust.runners import WorkerRunner
+
+LOAD_PROFILE = os.getenv('LOAD_PROFILE', 'ramp')
+LOAD_STEPS = int(os.getenv('LOAD_STEPS', '5'))
+SPIKE_BASELINE = float(os.getenv('SPIKE_BASELINE', '0.2'))
+SOAK_LEVEL = float(os.getenv('SOAK_LEVEL', '0.7'))
+STAGES_FILE = os.getenv('STAGES_FILE', 'stages.csv')
+# Share of a stage spent spawning or stopping users to reach its user count
+TRANSITION_SHARE = 0.1
+
+
+@dataclass
+class Stage:
+    name: str
+    duration: float
+    users: int
+    transition: float = TRANSITION_SHARE
+
+    def spawn_rate(self, previous_users):
+        return max(abs(self.users - previous_users) / (self.duration * self.transition), 1)
+
+
+class StagedShape(LoadTestShape):
+    # A fixed sequence of stages, planned from --users and --run-time when the test starts
+    abstract = True
+    use_common_options = True
+
+    def stages(self, users, run_time):
+        raise NotImplementedError
+
+    def reset_time(self):
+        super().reset_time()
+        options = self.runner.environment.parsed_options
+        self.plan = self.stages(options.num_users, options.run_time)
+        self.stages_written = False
+
+    def tick(self):
+        run_time = self.get_run_time()
+        if not self.stages_written:
+            self.write_stages(time.time() - run_time)
+        elapsed = 0
+        previous_users = 0
+        for stage in self.plan:
+            elapsed += stage.duration
+            if run_time < elapsed:
+                return stage.users, stage.spawn_rate(previous_users)
+            previous_users = stage.users
+        return None
+
+    def write_stages(self, started_at):
+        with open(STAGES_FILE, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['stage', 'start', 'end', 'users'])
+            start = started_at
+            for stage in self.plan:
+                writer.writerow([stage.name, round(start, 3), round(start + stage.duration, 3), stage.users])
+                start += stage.duration
+        self.stages_written = True
+
+
+class StepShape(StagedShape):
+    def stages(self, users, run_time):
+        return [Stage(f'step {step}', run_time / LOAD_STEPS, round(users * step / LOAD_STEPS))
+                for step in range(1, LOAD_STEPS + 1)]
+
+
+class SpikeShape(StagedShape):
+    def stages(self, users, run_time):
+        baseline = max(round(users * SPIKE_BASELINE), 1)
+        return [Stage('baseline', run_time * 0.4, baseline),
+                Stage('spike', run_time * 0.2, users),
+                Stage('recovery', run_time * 0.4, baseline)]
+
+
+class SoakShape(StagedShape):
+    def stages(self, users, run_time):
+        level = max(round(users * SOAK_LEVEL), 1)
+        return [Stage('ramp', run_time * 0.1, level, transition=1),
+                Stage('soak', run_time * 0.9, level)]
+
+
+PROFILES = {'step': StepShape, 'spike': SpikeShape, 'soak': SoakShape}
+
+if LOAD_PROFILE != 'ramp' and LOAD_PROFILE not in PROFILES:
+    raise ValueError(f"LOAD_PROFILE must be 'ramp' or one of {sorted(PROFILES)}, got {LOAD_PROFILE!r}")
+
+
+@events.init.add_listener
+def on_init(environment, **kwargs):
+    # Only the master (or a standalone runner) drives the shape
+    if LOAD_PROFILE == 'ramp' or isinstance(environment.runner, WorkerRunner):
+        return
+    if not environment.parsed_options.run_time:
+        raise ValueError(f'LOAD_PROFILE={LOAD_PROFILE} needs --run-time')
+    environment.shape_class = PROFILES[LOAD_PROFILE]()
+    environment.shape_class.runner = environment.runner
@@ -0,0 +1,140 @@
+"""The note workloads every backend is tested with.
+
+Each backend's tests/ files only map the workload onto its routes, e.g.
+
+    class NoteUser(DbTestUser):
+        create_note = Route('POST', '/notes/', expected=(201,))
+        list_notes = Route('GET', '/notes/')
+
+so every backend gets the same request mix and the same request bodies, and each
+request is checked against the status its backend answers. Request bodies are
+serialized once per user, not on every request.
+
+WORKLOAD_READ_PERCENT   Share of read tasks in db_test, db_bulk_test and
+                        db_pagination_test (default 50, an even mix).
+WORKLOAD_CONTENT_BYTES  Length of each note's content, by default the 23 bytes of
+                        "This is a note content.".
+WORKLOAD_BULK_SIZE      Notes written per request in db_bulk_test (default 10).
+"""
+import json
+import os
+from dataclasses import dataclass
+
+from locust import FastHttpUser, task
+
+READ_PERCENT = int(os.getenv('WORKLOAD_READ_PERCENT', '50'))
+CONTENT_BYTES = os.getenv('WORKLOAD_CONTENT_BYTES')
+BULK_SIZE = int(os.getenv('WORKLOAD_BULK_SIZE', '10'))
+
+if not 0 <= READ_PERCENT <= 100:
+    raise ValueError(f'WORKLOAD_READ_PERCENT must be between 0 and 100, got {READ_PERCENT}')
+
+NOTE = {
+    'title': 'Sample Note',
+    'content': 'x' * int(CONTENT_BYTES) if CONTENT_BYTES else 'This is a note content.',
+}
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+
+@dataclass(frozen=True)
+class Route:
+    method: str
+    path: str
+    # Statuses counted as a success; reads answer 200 everywhere, each route map sets the
+    # status its framework answers writes with
+    expected: tuple = (200,)
+    # Key the JSON body is nested under, for frameworks taking named parameters (Serverpod)
+    wrap: str | None = None
+
+    def body(self, payload):
+        if payload is None:
+            return None
+        return json.dumps({self.wrap: payload} if self.wrap else payload).encode()
+
+
+class WorkloadUser(FastHttpUser):
+    abstract = True
+
+    def call(self, route, body=None, path=None, name=None):
+        # Sends one request and marks unexpected statuses as failures; returns the response
+        # when it succeeded, None otherwise
+        with self.client.request(route.method, path or route.path, data=body,
+                                 headers=JSON_HEADERS if body is not None else None,
+                                 name=name, catch_response=True) as response:
+            if response.status_code not in route.expected:
+                response.failure(f"Unexpected status code: {response.status_code}. Response: {response.text}")
+                return None
+            return response
+
+
+class DbTestUser(WorkloadUser):
+    abstract = True
+    create_note: Route
+    list_notes: Route
+
+    def on_start(self):
+        self.note_body = self.create_note.body(NOTE)
+
+    @task(100 - READ_PERCENT)
+    def write_note(self):
+        self.call(self.create_note, self.note_body)
+
+    @task(READ_PERCENT)
+    def read_notes(self):
+        self.call(self.list_notes)
+
+
+class NoDbTestUser(WorkloadUser):
+    abstract = True
+    no_db_endpoint: Route
+    no_db_endpoint2: Route
+
+    @task
+    def no_db(self):
+        self.call(self.no_db_endpoint)
+
+    @task
+    def no_db2(self):
+        self.call(self.no_db_endpoint2)
+
+
+class DbBulkTestUser(WorkloadUser):
+    abstract = True
+    create_notes: Route
+    list_notes: Route
+
+    def on_start(self):
+        self.notes_body = self.create_notes.body([NOTE] * BULK_SIZE)
+
+    @task(100 - READ_PERCENT)
+    def write_notes_bulk(self):
+        self.call(self.create_notes, self.notes_body)
+
+    @task(READ_PERCENT)
+    def read_notes(self):
+        self.call(self.list_notes)
+
+
+class DbPaginationTestUser(WorkloadUser):
+    # Reads walk the table page by page with a keyset cursor, wrapping around at the end;
+    # list_notes is a path template with an {after_id} field
+    abstract = True
+    create_note: Route
+    list_notes: Route
+
+    def on_start(self):
+        self.note_body = self.create_note.body(NOTE)
+        self.after_id = 0
+
+    @task(100 - READ_PERCENT)
+    def write_note(self):
+        self.call(self.create_note, self.note_body)
+
+    @task(READ_PERCENT)
+    def read_next_page(self):
+        route = self.list_notes
+        response = self.call(route, path=route.path.format(after_id=self.after_id),
+                             name=route.path.replace('{after_id}', '[cursor]'))
+        if response is not None:
+            notes = response.json()
+            self.after_id = notes[-1]['id'] if notes else 0
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Samples Postgres and pgbouncer internals of the compose project while a test runs.
+
+Run from a backend directory while its compose project is up:
+
+    python3 postgres_sampler.py tests/results/db_test/postgres_stats.csv --interval 1
+
+Keeps one psql session open inside the `db` container for the whole run instead of
+starting a process per sample. Records the transaction and block rates of
+pg_stat_database, client sessions of pg_stat_activity by wait event type and, for the
+stacks with a `pgbouncer` service, the totals of SHOW POOLS. Stops when the `db`
+container goes away. Only the standard library is used.
+"""
+
+import argparse
+import csv
+import io
+import os
+import signal
+import subprocess
+import sys
+import time
+
+END_MARKER = '__sample_end__'
+
+DATABASE_QUERY = """
+SELECT d.xact_commit, d.xact_rollback, d.blks_hit, d.blks_read, d.tup_returned, d.tup_inserted, d.deadlocks,
+       a.active, a.idle_in_transaction, a.waiting_lock, a.waiting_lwlock, a.waiting_io, a.waiting_other
+FROM pg_stat_database d, (
+    SELECT count(*) FILTER (WHERE state = 'active') AS active,
+           count(*) FILTER (WHERE state LIKE 'idle in transaction%') AS idle_in_transaction,
+           count(*) FILTER (WHERE state = 'active' AND wait_event_type = 'Lock') AS waiting_lock,
+           count(*) FILTER (WHERE state = 'active' AND wait_event_type = 'LWLock') AS waiting_lwlock,
+           count(*) FILTER (WHERE state = 'active' AND wait_event_type = 'IO') AS waiting_io,
+           count(*) FILTER (WHERE state = 'active'
+                            AND wait_event_type NOT IN ('Lock', 'LWLock', 'IO', 'Client', 'Activity')) AS waiting_other
+    FROM pg_stat_activity
+    WHERE backend_type = 'client backend' AND pid <> pg_backend_pid()
+) a
+WHERE d.datname = current_database();
+"""
+# Cumulative pg_stat_database counters, written as per second rates
+DATABASE_COUNTERS = ['xact_commit', 'xact_rollback', 'blks_hit', 'blks_read', 'tup_returned', 'tup_inserted']
+# pg_stat_activity session counts, written as sampled
+DATABASE_GAUGES = ['active', 'idle_in_transaction', 'waiting_lock', 'waiting_lwlock', 'waiting_io', 'waiting_other']
+# SHOW POOLS columns summed over the application pools
+POOL_GAUGES = ['cl_active', 'cl_waiting', 'sv_active', 'sv_idle']
+
+
+class PsqlSession:
+    # One psql process in the db container, fed queries on stdin; each query is followed by
+    # an \echo of END_MARKER so the reader knows where its unaligned CSV output ends
+    def __init__(self, connection):
+        command = ['docker', 'compose', 'exec', '-T', 'db', 'sh', '-c',
+                   f'PGPASSWORD="$POSTGRES_PASSWORD" exec psql -X -q -A -F , -P footer=off {connection}']
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL, text=True, bufsize=1)
+
+    def query(self, sql):
+        # Rows as dicts; an empty list when the query failed, None once psql has exited
+        try:
+            self.process.stdin.write(f'{sql}\n\\echo {END_MARKER}\n')
+            self.process.stdin.flush()
+        except BrokenPipeError:
+            return None
+        lines = []
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                return None
+            if line.rstrip('\n') == END_MARKER:
+                return list(csv.DictReader(io.StringIO(''.join(lines))))
+            lines.append(line)
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.terminate()
+
+
+def has_service(service):
+    return bool(subprocess.run(['docker', 'compose', 'ps', '-q', service],
+                               capture_output=True, text=True).stdout.strip())
+
+
+def pool_totals(rows):
+    # Pools of the pgbouncer admin database itself are left out
+    rows = [row for row in rows if row['database'] != 'pgbouncer']
+    totals = {gauge: sum(int(row[gauge]) for row in rows) for gauge in POOL_GAUGES}
+    # maxwait_us was added in pgbouncer 1.8, maxwait alone only has whole seconds
+    totals['maxwait_ms'] = max((int(row['maxwait']) * 1000 + int(row.get('maxwait_us') or 0) / 1000
+                                for row in rows), default=0)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output', help='CSV file to write')
+    parser.add_argument('--interval', type=float,
+                        default=float(os.getenv('POSTGRES_SAMPLE_INTERVAL', '1')),
+                        help='Seconds between samples (default 1)')
+    args = parser.parse_args()
+
+    database = PsqlSession('-U "$POSTGRES_USER" -d "${POSTGRES_DB:-$POSTGRES_USER}"')
+    pgbouncer = PsqlSession('-h pgbouncer -U "$POSTGRES_USER" -d pgbouncer') if has_service('pgbouncer') else None
+
+    running = True
+
+    def stop(*_):
+        nonlocal running
+        running = False
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    columns = ['timestamp'] + [f'pg_{counter}_s' for counter in DATABASE_COUNTERS] + \
+        ['pg_deadlocks'] + [f'pg_{gauge}' for gauge in DATABASE_GAUGES]
+    if pgbouncer:
+        columns += [f'pgbouncer_{gauge}' for gauge in POOL_GAUGES] + ['pgbouncer_maxwait_ms']
+
+    with open(args.output, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=columns)
+        writer.writeheader()
+        previous = None
+        last = time.monotonic()
+        # Deadlines advance by the interval so slow queries do not make the sampling drift
+        deadline = last + args.interval
+        while running:
+            rows = database.query(DATABASE_QUERY)
+            if rows is None:
+                # psql exits with the db container once the compose project is down
+                break
+            now = time.monotonic()
+            if rows:
+                current = {key: int(value) for key, value in rows[0].items()}
+                if previous is not None:
+                    elapsed = now - last
+                    row = {'timestamp': round(time.time(), 3), 'pg_deadlocks': current['deadlocks']}
+                    row.update({f'pg_{counter}_s': round((current[counter] - previous[counter]) / elapsed, 2)
+                                for counter in DATABASE_COUNTERS})
+                    row.update({f'pg_{gauge}': current[gauge] for gauge in DATABASE_GAUGES})
+                    pools = pgbouncer.query('SHOW POOLS;') if pgbouncer else None
+                    if pools:
+                        row.update({f'pgbouncer_{key}': value for key, value in pool_totals(pools).items()})
+                    writer.writerow(row)
+                    file.flush()
+                previous, last = current, now
+            time.sleep(max(deadline - time.monotonic(), 0))
+            deadline += args.interval
+
+    database.close()
+    if pgbouncer:
+        pgbouncer.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
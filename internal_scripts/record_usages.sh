@@ -27,6 +27,10 @@ record_env_and_hashes() {
     echo "RECORDED_LOCUST_RUNTIME='$LOCUST_RUNTIME'" >> "$env_file"
     echo "RECORDED_LOCUST_USERS='$LOCUST_USERS'" >> "$env_file"
     echo "RECORDED_LOCUST_SPAWN_RATE='$LOCUST_SPAWN_RATE'" >> "$env_file"
+    echo "RECORDED_LOAD_MODEL='$LOAD_MODEL'" >> "$env_file"
+    echo "RECORDED_TARGET_RPS='$TARGET_RPS'" >> "$env_file"
+    echo "RECORDED_LOAD_PROFILE='$LOAD_PROFILE'" >> "$env_file"
+    echo "RECORDED_WORKLOAD='$WORKLOAD_READ_PERCENT/$WORKLOAD_CONTENT_BYTES/$WORKLOAD_BULK_SIZE'" >> "$env_file"
     
 }
 
@@ -78,6 +82,22 @@ check_env_and_hashes() {
             changed=true
         fi
 
+        if [ "$RECORDED_LOAD_MODEL" != "$LOAD_MODEL" ] || [ "$RECORDED_TARGET_RPS" != "$TARGET_RPS" ]; then
+            echo "Load model changed: was '$RECORDED_LOAD_MODEL' at '$RECORDED_TARGET_RPS' requests/s, now '$LOAD_MODEL' at '$TARGET_RPS' requests/s"
+            changed=true
+        fi
+
+        if [ "$RECORDED_LOAD_PROFILE" != "$LOAD_PROFILE" ]; then
+            echo "LOAD_PROFILE changed: was $RECORDED_LOAD_PROFILE, now $LOAD_PROFILE"
+            changed=true
+        fi
+
+        current_workload="$WORKLOAD_READ_PERCENT/$WORKLOAD_CONTENT_BYTES/$WORKLOAD_BULK_SIZE"
+        if [ "$RECORDED_WORKLOAD" != "$current_workload" ]; then
+            echo "Workload (read %/content bytes/bulk size) changed: was $RECORDED_WORKLOAD, now $current_workload"
+            changed=true
+        fi
+
         # Final decision based on changes
         if [ "$changed" = true ]; then
             echo "Environment or variables have changed. Proceeding with the script."
@@ -91,12 +111,33 @@ check_env_and_hashes() {
         return 1 # Changes detected
     fi
 }
+# Function to save the read-through cache counters of the Python backends next to the Locust results
+record_cache_stats() {
+    rm -f "$results_dir/cache_stats.json"
+    if [ -n "$NOTES_CACHE" ] && [ "$NOTES_CACHE" != "off" ]; then
+        curl --silent --fail "http://localhost:${PORT:-8000}/api/notes/cache_stats/" > "$results_dir/cache_stats.json" \
+            || rm -f "$results_dir/cache_stats.json"
+    fi
+}
+
+# Function to copy the finished run into the append-only results history, one directory per run
+# named after its UTC start and image hash, which scripts/graphs/graph_generator.py reads for regressions
+archive_run() {
+    backend_path="${PWD#"$dir"/backends/}"
+    image_hash=$(get_image_hash "benchmark" | sed 's/^sha256://' | cut -c1-12)
+    archive_dir="$dir/results_history/$backend_path/$test_type/${run_started_at}_${image_hash:-unknown}"
+    mkdir -p "$archive_dir"
+    cp "$results_dir"/*.csv "$results_dir"/*.txt "$results_dir"/*.json "$archive_dir"/ 2>/dev/null
+    echo "Run archived to $archive_dir"
+}
+
 # Check the environment and hashes at the beginning of the script
 if check_env_and_hashes; then
     # If the function returns 0, skip to the end or perform only the required actions
     exit 0
 fi
 
+run_started_at=$(date -u +%Y%m%dT%H%M%SZ)
 docker compose build
 docker compose up -d
 #!/bin/bash
@@ -108,11 +149,12 @@ output_file="$results_dir/cpu_usage.csv"
 mkdir -p results
 
 
-# Write header to the CSV file with added memory usage columns
-echo "timestamp,benchmark_cpu_usage,benchmark_mem_usage_mb,db_cpu_usage,db_mem_usage_mb" > "$output_file"
-
-# Function to record CPU and memory usage for both benchmark and database services
+# Function to record CPU and memory usage for both benchmark and database services with docker stats,
+# used when the cgroup v2 counters cannot be read
 record_cpu_mem_usage() {
+    # Write header to the CSV file with added memory usage columns
+    echo "timestamp,benchmark_cpu_usage,benchmark_mem_usage_mb,db_cpu_usage,db_mem_usage_mb" > "$output_file"
+
     while :; do
         # Check if Docker services are still running
         if ! docker compose ps | grep "Up" > /dev/null; then
@@ -151,8 +193,32 @@ record_cpu_mem_usage() {
     done
 }
 
+# Function to record CPU, memory, disk and network usage of the benchmark, db and pgbouncer services
+# every RESOURCE_SAMPLE_INTERVAL seconds straight from cgroup v2, until the services are down
+record_resource_usage() {
+    if command -v python3 > /dev/null; then
+        # Exit status 3 means the cgroup v2 counters are not reachable on this host, any other
+        # failure is treated the same so cpu_usage.csv is always written
+        if python3 "$dir/internal_scripts/resource_sampler.py" "$output_file"; then
+            return
+        fi
+    fi
+    echo "cgroup v2 sampler unavailable. Falling back to docker stats for CPU and memory usage."
+    record_cpu_mem_usage
+}
+
 # Run the function in the background
-record_cpu_mem_usage &
+record_resource_usage &
+
+# Written only by open-model runs and by the step, spike and soak profiles; leftovers
+# would be reported for runs that did not write them
+rm -f "$results_dir/corrected_response_time_histogram.csv" "$results_dir/stages.csv"
+
+# Sample pg_stat_database, pg_stat_activity wait events and pgbouncer pools next to the resource usage
+rm -f "$results_dir/postgres_stats.csv"
+if command -v python3 > /dev/null; then
+    python3 "$dir/internal_scripts/postgres_sampler.py" "$results_dir/postgres_stats.csv" &
+fi
 
 
 echo "Waiting for tester service to start..."
@@ -195,6 +261,8 @@ echo -e "\nTester service is no longer running."
 if docker compose ps -a tester | grep "Exit" > /dev/null; then
     echo "Tester service has completed. Proceeding to shut down..."
     record_env_and_hashes
+    record_cache_stats
+    archive_run
     # Bring down the services and remove them
     docker compose down -v
     echo "Services shut down and volumes removed."
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Samples CPU, memory, disk and network usage of the compose services from cgroup v2.
+
+Run from a backend directory while its compose project is up:
+
+    python3 resource_sampler.py tests/results/db_test/cpu_usage.csv --interval 0.25
+
+Reading the kernel counters directly costs a few file reads per sample, unlike
+`docker stats --no-stream` which takes one to two seconds per call. Exits with
+status 3 when the cgroup v2 files are not reachable (cgroup v1 hosts, Docker Desktop),
+before cpu_usage.csv is created, so record_usages.sh can fall back to docker stats. Only the standard library is used.
+"""
+
+import argparse
+import csv
+import os
+import signal
+import subprocess
+import sys
+import time
+
+CGROUP_ROOT = '/sys/fs/cgroup'
+DEFAULT_SERVICES = ['benchmark', 'db', 'pgbouncer']
+# Services the sampler cannot run without; the others are sampled when present
+REQUIRED_SERVICES = ['benchmark', 'db']
+# Per-service columns, in the order they are written
+METRICS = ['cpu_usage', 'mem_usage_mb', 'io_read_mb_s', 'io_write_mb_s', 'net_rx_mb_s', 'net_tx_mb_s']
+MB = 1024 ** 2
+UNAVAILABLE = 3
+
+
+def container_pid(service):
+    container_id = subprocess.run(['docker', 'compose', 'ps', '-q', service],
+                                  capture_output=True, text=True).stdout.split()
+    if not container_id:
+        return None
+    pid = subprocess.run(['docker', 'inspect', '-f', '{{.State.Pid}}', container_id[0]],
+                         capture_output=True, text=True).stdout.strip()
+    return int(pid) if pid.isdigit() and int(pid) > 0 else None
+
+
+def cgroup_path(pid):
+    # The unified hierarchy is the "0::" entry; cgroup v1 hosts do not have one. On Docker
+    # Desktop the pid belongs to the VM and has no /proc entry on the host
+    try:
+        with open(f'/proc/{pid}/cgroup') as file:
+            for line in file:
+                if line.startswith('0::'):
+                    path = os.path.join(CGROUP_ROOT, line[3:].strip().lstrip('/'))
+                    if os.path.exists(os.path.join(path, 'cpu.stat')):
+                        return path
+    except OSError:
+        pass
+    return None
+
+
+def read_keyed(path):
+    with open(path) as file:
+        return {key: int(value) for key, value in (line.split() for line in file)}
+
+
+def read_io_bytes(path):
+    # io.stat has one "<major>:<minor> rbytes=... wbytes=..." line per device
+    read_bytes = write_bytes = 0
+    with open(os.path.join(path, 'io.stat')) as file:
+        for line in file:
+            fields = dict(field.split('=') for field in line.split()[1:])
+            read_bytes += int(fields.get('rbytes', 0))
+            write_bytes += int(fields.get('wbytes', 0))
+    return read_bytes, write_bytes
+
+
+def read_net_bytes(pid):
+    # /proc/<pid>/net/dev shows the interfaces of the container's network namespace
+    rx_bytes = tx_bytes = 0
+    with open(f'/proc/{pid}/net/dev') as file:
+        for line in file.readlines()[2:]:
+            interface, counters = line.split(':', 1)
+            if interface.strip() == 'lo':
+                continue
+            counters = counters.split()
+            rx_bytes += int(counters[0])
+            tx_bytes += int(counters[8])
+    return rx_bytes, tx_bytes
+
+
+class Container:
+    def __init__(self, service, pid, path):
+        self.service = service
+        self.pid = pid
+        self.path = path
+        self.previous = None
+
+    def counters(self):
+        usage_usec = read_keyed(os.path.join(self.path, 'cpu.stat'))['usage_usec']
+        return (usage_usec, *read_io_bytes(self.path), *read_net_bytes(self.pid))
+
+    def memory_mb(self):
+        # Same as docker stats: current usage without the reclaimable inactive page cache
+        with open(os.path.join(self.path, 'memory.current')) as file:
+            current = int(file.read())
+        inactive_file = read_keyed(os.path.join(self.path, 'memory.stat')).get('inactive_file', 0)
+        return max(current - inactive_file, 0) / MB
+
+    def sample(self, elapsed):
+        counters = self.counters()
+        previous, self.previous = self.previous, counters
+        usage_usec, *byte_counters = (current - last for current, last in zip(counters, previous))
+        rates = [round(delta / MB / elapsed, 4) for delta in byte_counters]
+        return [round(usage_usec / (elapsed * 1e6) * 100, 2), round(self.memory_mb(), 2), *rates]
+
+
+def discover(services):
+    containers = []
+    for service in services:
+        try:
+            pid = container_pid(service)
+        except OSError:
+            # No docker CLI on this host
+            pid = None
+        path = cgroup_path(pid) if pid else None
+        if path is None:
+            if service in REQUIRED_SERVICES:
+                print(f"No cgroup v2 counters for {service}.", file=sys.stderr)
+                return None
+            continue
+        containers.append(Container(service, pid, path))
+    return containers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output', help='CSV file to write')
+    parser.add_argument('--interval', type=float,
+                        default=float(os.getenv('RESOURCE_SAMPLE_INTERVAL', '0.25')),
+                        help='Seconds between samples (default 0.25)')
+    parser.add_argument('--services', nargs='+', default=DEFAULT_SERVICES)
+    args = parser.parse_args()
+
+    containers = discover(args.services)
+    if containers is None:
+        return UNAVAILABLE
+    try:
+        # The first read also checks that every counter file is readable before the CSV is created
+        for container in containers:
+            container.previous = container.counters()
+            container.memory_mb()
+    except (OSError, KeyError, ValueError) as error:
+        print(f"Cannot read the resource counters: {error}", file=sys.stderr)
+        return UNAVAILABLE
+
+    running = True
+
+    def stop(*_):
+        nonlocal running
+        running = False
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    with open(args.output, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['timestamp'] + [f'{container.service}_{metric}'
+                                         for container in containers for metric in METRICS])
+        last = time.monotonic()
+        # Deadlines advance by the interval so slow reads do not make the sampling drift
+        deadline = last + args.interval
+        while running:
+            time.sleep(max(deadline - time.monotonic(), 0))
+            deadline += args.interval
+            now = time.monotonic()
+            try:
+                rows = [container.sample(now - last) for container in containers]
+            except (OSError, KeyError):
+                # The cgroup goes away with the container once the compose project is down
+                break
+            last = now
+            writer.writerow([round(time.time(), 3)] + [value for row in rows for value in row])
+            file.flush()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,7 @@
 # Function to get user input for test_type
 get_user_test_type_selection() {
     echo "Please enter the number corresponding to the test type:"
-    select choice in "db_test" "no_db_test"; do
+    select choice in "db_test" "no_db_test" "db_pagination_test" "db_bulk_test"; do
         case $choice in
             db_test )
                 # Use 'return' to indicate the choice by an exit status code
@@ -11,8 +11,16 @@ get_user_test_type_selection() {
                 # Different exit status code for no_db_test
                 return 2
                 ;;
+            db_pagination_test )
+                # Keyset pagination walk, only provided by the Python backends
+                return 3
+                ;;
+            db_bulk_test )
+                # Batched note creation, only provided by the Python backends
+                return 4
+                ;;
             * )
-                echo "Invalid selection. Please enter 1 for db_test or 2 for no_db_test."
+                echo "Invalid selection. Please enter 1 for db_test, 2 for no_db_test, 3 for db_pagination_test or 4 for db_bulk_test."
                 ;;
         esac
     done
@@ -28,6 +36,10 @@ if [ -z "$test_type" ]; then
         test_type="db_test"
     elif [ $result -eq 2 ]; then
         test_type="no_db_test"
+    elif [ $result -eq 3 ]; then
+        test_type="db_pagination_test"
+    elif [ $result -eq 4 ]; then
+        test_type="db_bulk_test"
     fi
     export test_type
 else
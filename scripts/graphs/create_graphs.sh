@@ -5,7 +5,7 @@ echo "Building and running graph generator Docker image..."
 # Build the Docker image for graph generation
 docker build -t graph_generator_image .
 
-# Run the Docker container with the necessary volume mount
-docker run --rm -v "$(pwd)/../../:/mnt/data" -v "$(pwd)/:/usr/src/app" graph_generator_image python graph_generator.py
+# Run the Docker container with the necessary volume mount, forwarding the GRAPH_* tuning variables when set
+docker run --rm -e GRAPH_WORKERS -e GRAPH_MERGE_DIRECTION -e GRAPH_MERGE_TOLERANCE -e GRAPH_MAX_POINTS -e GRAPH_INCLUDE -e GRAPH_FACET -e GRAPH_WARMUP_SECONDS -e GRAPH_STEADY_WINDOW -e GRAPH_STEADY_MAX_CV -e GRAPH_SLO_P99_MS -e GRAPH_KNEE_BINS -e GRAPH_HISTORY_RUNS -e GRAPH_REGRESSION_ALPHA -e GRAPH_REGRESSION_THRESHOLD -e FORCE_REGENERATE -v "$(pwd)/../../:/mnt/data" -v "$(pwd)/:/usr/src/app" graph_generator_image python graph_generator.py
 
 echo "Graph generation completed."
\ No newline at end of file
@@ -1,14 +1,101 @@
 import glob
+import hashlib
+import io
 import json
+import math
 import os
 import re
+import sqlite3
 import time
+from concurrent.futures import ProcessPoolExecutor
 from urllib.parse import urlparse, urlunparse
 
+import matplotlib
+matplotlib.use('Agg')  # Workers render to files only, no display is needed
+import matplotlib.image as mpimg
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
+# docker stats reports memory as "13.86MiB", "1.2GiB", ...; factors convert each unit to MiB
+MEMORY_UNITS_MB = {'B': 1 / 1024 ** 2, 'KiB': 1 / 1024, 'kB': 1 / 1024,
+                   'MiB': 1, 'MB': 1, 'GiB': 1024, 'GB': 1024, 'TiB': 1024 ** 2}
+RESOURCE_COLUMNS = ['benchmark_cpu_usage', 'benchmark_mem_usage_mb',
+                    'db_cpu_usage', 'db_mem_usage_mb']
+# Optional series from resource_sampler.py (network/disk) and postgres_sampler.py (Postgres/pgbouncer)
+INTERNALS_COLUMNS = ['benchmark_net_rx_mb_s', 'benchmark_net_tx_mb_s', 'db_io_read_mb_s', 'db_io_write_mb_s',
+                     'pg_xact_commit_s', 'pg_xact_rollback_s', 'pg_active', 'pg_waiting_lock',
+                     'pg_waiting_lwlock', 'pg_waiting_io', 'pg_waiting_other', 'pgbouncer_cl_waiting',
+                     'pgbouncer_maxwait_ms']
+# Postgres samples further than this many seconds from a resource sample are left empty
+POSTGRES_MERGE_TOLERANCE = 2
+# How Locust rows are matched to resource samples: "backward" takes the latest sample
+# taken before the row, "forward"/"nearest" are also accepted by pd.merge_asof
+MERGE_DIRECTION = os.getenv('GRAPH_MERGE_DIRECTION', 'backward')
+# Maximum distance in seconds between a row and its sample, unset means no limit
+MERGE_TOLERANCE = os.getenv('GRAPH_MERGE_TOLERANCE')
+# Processes used to parse and render services, defaults to one per core
+GRAPH_WORKERS = int(os.getenv('GRAPH_WORKERS', os.cpu_count() or 1))
+# Upper bound of points per service passed to the graphs and the dashboard, 0 keeps every row
+GRAPH_MAX_POINTS = int(os.getenv('GRAPH_MAX_POINTS', '2000'))
+# Series whose shape (and spikes) the downsampling preserves
+DOWNSAMPLE_COLUMNS = ['Requests/s', 'Failures/s', 'Responses/s', '50%', '75%', '99%',
+                      'Total Average Response Time', 'User Count']
+# Phase detection: the first GRAPH_WARMUP_SECONDS are warm-up, the steady state starts once
+# the user count is at its maximum and, over GRAPH_STEADY_WINDOW consecutive rows, the
+# coefficient of variation of Requests/s is below GRAPH_STEADY_MAX_CV and its mean is within
+# that fraction of the plateau's median throughput; the rest is ramp
+WARMUP_SECONDS = float(os.getenv('GRAPH_WARMUP_SECONDS', '10'))
+STEADY_WINDOW = int(os.getenv('GRAPH_STEADY_WINDOW', '10'))
+STEADY_MAX_CV = float(os.getenv('GRAPH_STEADY_MAX_CV', '0.1'))
+PHASE_LABELS = {'warm-up': 'Warm-up', 'ramp': 'Ramp', 'steady': 'Steady'}
+PHASE_COLORS = {'warm-up': 'gray', 'ramp': 'orange', 'steady': 'green'}
+# History column averaged per phase and the summary key it is reported under
+PHASE_METRICS = {'Requests/s': 'Average Requests/s', 'Failures/s': 'Average Failures/s',
+                 '99%': 'Average Response Time 99% (ms)'}
+# Saturation analysis: rows are grouped into GRAPH_KNEE_BINS user-count bins whose median
+# throughput and p99 form the load curves, checked against a p99 SLO of GRAPH_SLO_P99_MS
+SLO_P99_MS = float(os.getenv('GRAPH_SLO_P99_MS', '1000'))
+KNEE_BINS = int(os.getenv('GRAPH_KNEE_BINS', '20'))
+SLO_METRIC = f'Max Users at p99 < {SLO_P99_MS:g} ms'
+SATURATION_METRICS = [SLO_METRIC, 'Peak Sustainable Requests/s', 'Knee User Count']
+# Comparison graphs: GRAPH_INCLUDE limits them to the listed languages/frameworks (comma
+# separated), GRAPH_FACET adds one comparison per "language" or "framework"
+GRAPH_INCLUDE = [pattern.strip() for pattern in os.getenv('GRAPH_INCLUDE', '').split(',') if pattern.strip()]
+GRAPH_FACET = os.getenv('GRAPH_FACET', '').lower()
+if GRAPH_FACET not in ('', 'language', 'framework'):
+    raise ValueError(f"Unsupported GRAPH_FACET '{GRAPH_FACET}', expected 'language' or 'framework'")
+# Runs archived by internal_scripts/record_usages.sh; they feed the SQLite history used for
+# regression checks and are kept out of the report itself
+HISTORY_DIR = '/mnt/data/results_history'
+HISTORY_DB = os.path.join(HISTORY_DIR, 'history.sqlite')
+# Each run is reduced to its steady-state means. The latest run is compared with the spread of up
+# to GRAPH_HISTORY_RUNS earlier runs of the same backend and test type; a regression needs a
+# one-sided p-value below GRAPH_REGRESSION_ALPHA and a change from their mean larger than
+# GRAPH_REGRESSION_THRESHOLD
+HISTORY_RUNS = int(os.getenv('GRAPH_HISTORY_RUNS', '5'))
+REGRESSION_ALPHA = float(os.getenv('GRAPH_REGRESSION_ALPHA', '0.01'))
+REGRESSION_THRESHOLD = float(os.getenv('GRAPH_REGRESSION_THRESHOLD', '0.05'))
+# History metric, its Locust history column and whether higher values are better
+HISTORY_METRICS = {'requests_per_s': ('Requests/s', True), 'p99_ms': ('99%', False)}
+# Bumped when the stored per-run values change meaning; the history is then rebuilt from the archive
+HISTORY_SCHEMA_VERSION = 2
+# Parsed results and the fingerprints of every generated output are kept here between runs
+GRAPH_CACHE_DIR = os.getenv('GRAPH_CACHE_DIR', '/mnt/data/.graph_cache')
+MANIFEST_PATH = os.path.join(GRAPH_CACHE_DIR, 'manifest.json')
+# The dashboard loads index.json first and fetches a service's shard once it is selected
+DASHBOARD_DATA_DIR = '/mnt/data/benchmark-app/public/data'
+DASHBOARD_INDEX_PATH = os.path.join(DASHBOARD_DATA_DIR, 'index.json')
+# Rebuild every output even when its inputs did not change
+FORCE_REGENERATE = os.getenv('FORCE_REGENERATE', 'false').lower() in ('1', 'true', 'yes')
+# Files next to benchmark_stats_history.csv that feed a service's outputs
+RESULT_FILES = ['benchmark_stats_history.csv', 'cpu_usage.csv', 'cache_stats.json',
+                'response_time_histogram.csv', 'postgres_stats.csv', 'corrected_response_time_histogram.csv']
+# Percentiles computed from the merged response-time histograms
+HISTOGRAM_PERCENTILES = {'p50': 0.5, 'p90': 0.9, 'p99': 0.99, 'p99.9': 0.999}
+# Method of the send lag rows in corrected_response_time_histogram.csv (locust_common.open_model)
+SEND_LAG_METHOD = 'SCHEDULE'
+
 
 def process_file(file_path):
     # Load the data from the provided file
@@ -52,149 +139,488 @@ def process_file(file_path):
     return data, summary
 
 
+def parse_memory_mb(column):
+    if pd.api.types.is_numeric_dtype(column):
+        return column.astype(float)
+    parts = column.astype(str).str.extract(r'^\s*([0-9.]+)\s*([A-Za-z]*)')
+    values = pd.to_numeric(parts[0], errors='coerce')
+    factors = parts[1].replace('', 'MiB').map(MEMORY_UNITS_MB)
+    return values * factors
+
+
+def parse_cpu_percent(column):
+    # docker stats writes "12.34%", resource_sampler.py writes plain numbers
+    if pd.api.types.is_numeric_dtype(column):
+        return column.astype(float)
+    return column.astype(str).str.rstrip('%').astype(float)
+
+
 def process_file_cpu_usage(file_path, summary):
     # Load the data from the provided file
     data = pd.read_csv(file_path.replace(
         "benchmark_stats_history.csv", "cpu_usage.csv"), on_bad_lines='skip')
 
-    # Convert 'timestamp' to numeric type before converting to datetime
-    data['timestamp'] = pd.to_numeric(
-        data['timestamp'], errors='coerce').astype('int').apply(int)
-    data['Timestamp'] = pd.to_datetime(data['timestamp'], unit='s')
-    data['Timestamp'] = (data['Timestamp'] -
-                         data['Timestamp'].min()).dt.total_seconds()
-
-    # Ensure that the 'benchmark_cpu_usage' column is string type, then remove the percentage sign and convert to float
-    data['benchmark_cpu_usage'] = data['benchmark_cpu_usage'].astype(
-        str).str.rstrip('%').astype(float)
+    # resource_sampler.py samples several times per second; the integer epoch second is the
+    # key for joining with the Locust history, 'Timestamp' keeps the sub-second offsets
+    epoch = pd.to_numeric(data['timestamp'], errors='coerce').astype(float)
+    data['timestamp'] = epoch.astype('int').apply(int)
+    data['Timestamp'] = epoch - epoch.min()
 
-    # Ensure that the 'db_cpu_usage' column is string type, then remove the percentage sign and convert to float
-    data['db_cpu_usage'] = data['db_cpu_usage'].astype(
-        str).str.rstrip('%').astype(float)
+    # CPU percentages and memory in MiB for every sampled service (benchmark, db and pgbouncer when present)
+    for column in data.columns:
+        if column.endswith('_cpu_usage'):
+            data[column] = parse_cpu_percent(data[column])
+        elif column.endswith('_mem_usage_mb'):
+            # Parse the memory strings once so every consumer gets MiB floats
+            data[column] = parse_memory_mb(data[column])
 
     # Calculating Responses per Second
     data['Time Difference'] = data['Timestamp'].diff()
 
     summary["Average Server CPU Usage"] = data['benchmark_cpu_usage'].mean()
     summary["Average Database CPU Usage"] = data['db_cpu_usage'].mean()
+    if 'pgbouncer_cpu_usage' in data.columns:
+        summary["Average PgBouncer CPU Usage"] = data['pgbouncer_cpu_usage'].mean()
+    if 'benchmark_net_rx_mb_s' in data.columns:
+        summary["Average Server Network (MB/s)"] = (
+            data['benchmark_net_rx_mb_s'] + data['benchmark_net_tx_mb_s']).mean()
+        summary["Average Database Disk Write (MB/s)"] = data['db_io_write_mb_s'].mean()
     return data, summary
 
 
-def compare_and_plot(all_data, all_summaries, all_cpu, custom_result_file_name=None):
-    # Number of datasets
-    num_datasets = len(all_data)
-
-    # Plotting with a vertical summary table with adjusted width
-    fig, axs = plt.subplots(14, 1, figsize=(20, 80))
-
-    # Colors for different datasets
-    colors = ['green', 'red', 'blue', 'orange', 'purple',
-              'brown', 'pink', 'gray', 'olive', 'cyan']
+def process_postgres_stats(file_path, cpu, summary):
+    # Present when postgres_sampler.py ran; its columns are joined onto the resource samples
+    stats_path = file_path.replace(
+        "benchmark_stats_history.csv", "postgres_stats.csv")
+    if not os.path.exists(stats_path):
+        return cpu, summary
+    stats = pd.read_csv(stats_path, on_bad_lines='skip')
+    if stats.empty:
+        return cpu, summary
+    stats['timestamp'] = pd.to_numeric(stats['timestamp'], errors='coerce').astype('int')
+    cpu = pd.merge_asof(cpu.sort_values('timestamp'), stats.sort_values('timestamp'), on='timestamp',
+                        direction='nearest', tolerance=POSTGRES_MERGE_TOLERANCE)
+
+    summary["Average DB Commits/s"] = stats['pg_xact_commit_s'].mean()
+    blocks = stats['pg_blks_hit_s'].sum() + stats['pg_blks_read_s'].sum()
+    if blocks:
+        summary["DB Buffer Cache Hit Ratio (%)"] = stats['pg_blks_hit_s'].sum() / blocks * 100
+    summary["Average DB Sessions Waiting on Locks"] = stats['pg_waiting_lock'].mean()
+    summary["Peak DB Active Sessions"] = stats['pg_active'].max()
+    if 'pgbouncer_cl_waiting' in stats.columns:
+        summary["Peak PgBouncer Waiting Clients"] = stats['pgbouncer_cl_waiting'].max()
+        summary["Peak PgBouncer Wait (ms)"] = stats['pgbouncer_maxwait_ms'].max()
+    return cpu, summary
+
+
+def process_cache_stats(file_path, summary):
+    # Present only when the run enabled the notes read-through cache
+    stats_path = file_path.replace(
+        "benchmark_stats_history.csv", "cache_stats.json")
+    if not os.path.exists(stats_path):
+        return summary
+    with open(stats_path, 'r', encoding='utf-8') as file:
+        stats = json.load(file)
+    if 'hit_ratio' in stats:
+        summary['Cache Hit Ratio (%)'] = stats['hit_ratio'] * 100
+    return summary
+
+
+def histogram_percentiles(histogram):
+    # histogram maps response time (ms) to request count; a percentile is the smallest
+    # response time whose cumulative count reaches that share of all requests
+    histogram = histogram.groupby(level=0).sum().sort_index()
+    cumulative = histogram.cumsum().to_numpy()
+    if len(cumulative) == 0 or cumulative[-1] == 0:
+        return {}
+    return {name: float(histogram.index[np.searchsorted(cumulative, share * cumulative[-1])])
+            for name, share in HISTOGRAM_PERCENTILES.items()}
+
+
+def detect_phases(data):
+    # Returns {phase: [start, end]} in seconds since the start of the run, 'steady' is
+    # missing when the throughput never settled at the maximum user count
+    timestamps = data['Timestamp']
+    start, end = float(timestamps.min()), float(timestamps.max())
+    warmup_end = min(start + WARMUP_SECONDS, end)
+    phases = {'warm-up': [start, warmup_end]}
+
+    peak = data[(data['User Count'] == data['User Count'].max())
+                & (timestamps >= warmup_end)]
+    rolling = peak['Requests/s'].rolling(STEADY_WINDOW, min_periods=STEADY_WINDOW)
+    variation = (rolling.std() / rolling.mean()).to_numpy()
+    plateau = peak['Requests/s'].median()
+    drift = (np.abs(rolling.mean() - plateau) / plateau).to_numpy()
+    stable = np.flatnonzero((variation < STEADY_MAX_CV) & (drift < STEADY_MAX_CV))
+    if len(stable):
+        # The steady state starts with the first row of the first stable window
+        steady_start = float(peak['Timestamp'].iloc[stable[0] - STEADY_WINDOW + 1])
+        phases['ramp'] = [warmup_end, steady_start]
+        phases['steady'] = [steady_start, float(peak['Timestamp'].max())]
+    else:
+        phases['ramp'] = [warmup_end, end]
+    return phases
+
+
+def process_phases(data, summary):
+    phases = detect_phases(data)
+    for phase, (start, end) in phases.items():
+        rows = data[data['Timestamp'].between(start, end)]
+        for column, metric in PHASE_METRICS.items():
+            summary[f'{PHASE_LABELS[phase]} {metric}'] = rows[column].mean()
+    summary['phases'] = phases
+    return summary
+
+
+def stage_label(stage):
+    return f"{stage.title()} Stage"
+
+
+def process_stages(file_path, data, summary):
+    # Written by internal_scripts/locust_common for the step, spike and soak load profiles
+    stages_path = file_path.replace(
+        "benchmark_stats_history.csv", "stages.csv")
+    if not os.path.exists(stages_path):
+        return summary
+    stages = pd.read_csv(stages_path, on_bad_lines='skip')
+    histogram_path = file_path.replace(
+        "benchmark_stats_history.csv", "response_time_histogram.csv")
+    histogram = pd.read_csv(histogram_path, on_bad_lines='skip') if os.path.exists(histogram_path) else None
+    offset = (data['timestamp'] - data['Timestamp']).iloc[0]
+
+    summary['stages'] = {}
+    for stage in stages.itertuples():
+        label = stage_label(stage.stage)
+        rows = data[(data['timestamp'] >= stage.start) & (data['timestamp'] < stage.end)]
+        summary[f'{label} Users'] = stage.users
+        for column, metric in PHASE_METRICS.items():
+            summary[f'{label} {metric}'] = rows[column].mean()
+        if histogram is not None:
+            window = histogram[(histogram['timestamp'] >= stage.start) & (histogram['timestamp'] < stage.end)]
+            # Stages without any completed request have no percentiles
+            summary[f'{label} Response Time p99 (ms)'] = histogram_percentiles(
+                window.set_index('response_time_ms')['count']).get('p99', np.nan)
+        summary['stages'][stage.stage] = (float(stage.start - offset), float(stage.end - offset))
+    return summary
+
+
+def load_curves(data):
+    # Median Requests/s and p99 per user-count bin, ordered by users
+    bins = pd.cut(data['User Count'], bins=min(KNEE_BINS, data['User Count'].nunique()))
+    curves = data.groupby(bins, observed=True).agg(
+        users=('User Count', 'max'), throughput=('Requests/s', 'median'), p99=('99%', 'median'))
+    return curves.dropna().sort_values('users').reset_index(drop=True)
+
+
+def knee_point(x, y):
+    # Kneedle: on the curve scaled to the unit square, the knee of a concave increasing
+    # curve is where it lies furthest above the diagonal
+    x_range, y_range = x.max() - x.min(), y.max() - y.min()
+    if x_range == 0 or y_range == 0:
+        return len(x) - 1
+    difference = (y - y.min()) / y_range - (x - x.min()) / x_range
+    return int(np.argmax(difference))
+
+
+def process_saturation(data, summary):
+    # Warm-up rows are left out, their cold-start latency says nothing about saturation
+    if 'phases' in summary:
+        data = data[data['Timestamp'] > summary['phases']['warm-up'][1]]
+    curves = load_curves(data)
+    if len(curves) < 3:
+        return summary
+    users = curves['users'].to_numpy(dtype=float)
+    within_slo = (curves['p99'] < SLO_P99_MS).to_numpy()
+    # From the first bin meeting the SLO up to the next bin breaking it
+    meeting = np.flatnonzero(within_slo)
+    if len(meeting) == 0:
+        summary[SLO_METRIC] = 0.0
+        summary['Peak Sustainable Requests/s'] = 0.0
+    else:
+        breaking = np.flatnonzero(~within_slo[meeting[0]:])
+        end = len(curves) if len(breaking) == 0 else meeting[0] + breaking[0]
+        summary[SLO_METRIC] = users[end - 1]
+        summary['Peak Sustainable Requests/s'] = curves['throughput'].iloc[meeting[0]:end].max()
+    # Where throughput stops growing with concurrency
+    summary['Knee User Count'] = users[knee_point(
+        users, curves['throughput'].to_numpy(dtype=float))]
+    return summary
+
+
+def steady_window(data, phases):
+    # Epoch seconds of the steady phase, None when there is none
+    if 'steady' not in phases:
+        return None
+    offset = (data['timestamp'] - data['Timestamp']).iloc[0]
+    start, end = phases['steady']
+    return start + offset, end + offset
+
+
+def histogram_summary(histogram, data, summary, prefix=''):
+    for name, value in histogram_percentiles(
+            histogram.set_index('response_time_ms')['count']).items():
+        summary[f'{prefix}Response Time {name} (ms)'] = value
+
+    window = steady_window(data, summary.get('phases', {}))
+    if window is None:
+        return summary
+    steady = histogram[histogram['timestamp'].between(*window)]
+    for name, value in histogram_percentiles(
+            steady.set_index('response_time_ms')['count']).items():
+        summary[f'Steady {prefix}Response Time {name} (ms)'] = value
+    return summary
+
+
+def process_response_time_histogram(file_path, data, summary):
+    # Written by internal_scripts/locust_common, absent for runs recorded before it
+    histogram_path = file_path.replace(
+        "benchmark_stats_history.csv", "response_time_histogram.csv")
+    if not os.path.exists(histogram_path):
+        return summary
+    histogram = pd.read_csv(histogram_path, on_bad_lines='skip')
+    if histogram.empty:
+        return summary
+    return histogram_summary(histogram, data, summary)
+
+
+def process_corrected_histogram(file_path, data, summary):
+    # Only written by LOAD_MODEL=open runs: response times plus how late each request was
+    # sent behind its schedule, and the send lag itself under the SCHEDULE method
+    histogram_path = file_path.replace(
+        "benchmark_stats_history.csv", "corrected_response_time_histogram.csv")
+    if not os.path.exists(histogram_path):
+        return summary
+    histogram = pd.read_csv(histogram_path, on_bad_lines='skip')
+    lag = histogram['method'] == SEND_LAG_METHOD
+    if not lag.all():
+        summary = histogram_summary(histogram[~lag], data, summary, 'Corrected ')
+    if lag.any():
+        for name, value in histogram_percentiles(
+                histogram[lag].set_index('response_time_ms')['count']).items():
+            summary[f'Send Lag {name} (ms)'] = value
+    return summary
+
+
+def lttb_indices(x, y, threshold):
+    # Largest-Triangle-Three-Buckets: keeps the first and last points and, from every
+    # bucket in between, the point forming the largest triangle with the previously
+    # kept point and the average of the next bucket, so peaks and dips survive
+    length = len(x)
+    if threshold >= length or threshold < 3:
+        return np.arange(length)
+    bucket_size = (length - 2) / (threshold - 2)
+    indices = np.empty(threshold, dtype=int)
+    indices[0], indices[-1] = 0, length - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        next_end = min(int((bucket + 2) * bucket_size) + 1, length)
+        average_x = x[end:next_end].mean()
+        average_y = y[end:next_end].mean()
+        areas = np.abs((x[previous] - average_x) * (y[start:end] - y[previous]) -
+                       (x[previous] - x[start:end]) * (average_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        indices[bucket + 1] = previous
+    return indices
+
+
+def downsample(data, x_column, y_columns, max_points=GRAPH_MAX_POINTS):
+    # Keeps the union of the LTTB points of every series, splitting the budget between them
+    if not max_points or len(data) <= max_points:
+        return data
+    y_columns = [column for column in y_columns if column in data.columns]
+    if not y_columns:
+        return data
+    threshold = max(3, max_points // len(y_columns))
+    x = data[x_column].to_numpy(dtype=float)
+    keep = np.array([], dtype=int)
+    for column in y_columns:
+        y = np.nan_to_num(data[column].to_numpy(dtype=float))
+        keep = np.union1d(keep, lttb_indices(x, y, threshold))
+    return data.iloc[keep]
+
+
+# One figure per panel; the summary table grows with its number of rows
+PANEL_TITLES = ['Requests per Second Over Time', 'Failures per Second Over Time', 'Response Time Percentiles Over Time',
+                'Responses per Second Over Time', 'Cumulative Requests Over Time', 'Response Time Distribution',
+                'Load vs Response Time', 'User Count Over Time', 'Average Content Size Over Time', 'Server Cpu Usage',
+                'Database Cpu Usage', 'Server Memory Usage Over Time', 'Database Memory Usage Over Time',
+                'Server Network Throughput (MB/s)', 'Database Disk I/O (MB/s)', 'Database Transactions per Second',
+                'Database Sessions Waiting by Wait Event', 'PgBouncer Waiting Clients', 'Summary Table']
+# Panels drawn only when one of the services has the resource column they plot
+OPTIONAL_PANELS = {13: 'benchmark_net_rx_mb_s', 14: 'db_io_write_mb_s', 15: 'pg_xact_commit_s',
+                   16: 'pg_waiting_lock', 17: 'pgbouncer_cl_waiting'}
+# Panel height of the original 14 panel layout
+PANEL_SIZE = (20, 80 / 14)
+TABLE_ROW_HEIGHT = 0.5
+
+
+def dataset_colors(count):
+    # Qualitative palettes while they have enough distinct colors, then an evenly sampled colormap
+    if count <= 10:
+        return [plt.get_cmap('tab10')(i) for i in range(count)]
+    if count <= 20:
+        return [plt.get_cmap('tab20')(i) for i in range(count)]
+    return [plt.get_cmap('turbo')(value) for value in np.linspace(0, 1, count)]
+
+
+def draw_panel(ax, panel, all_data, all_summaries, all_cpu):
+    if panel == len(PANEL_TITLES) - 1:
+        plot_summary_of_all(all_summaries, ax)
+        return
 
-    # Ensure there are enough colors for the datasets
-    if num_datasets > len(colors):
-        raise ValueError("Need more colors for plotting")
-    if len(all_data) != len(all_summaries) != len(all_cpu):
-        raise ValueError(
-            "all_data, all_summaries, all_cpu should have same length")
-    # Plotting the graphs for each dataset
-    for i, (file_path, data) in enumerate(all_data.items()):
+    num_datasets = len(all_data)
+    for (file_path, data), color in zip(all_data.items(), dataset_colors(num_datasets)):
         file_name = get_adjusted_file_name(file_path)
-        color = colors[i]
+        cpu = all_cpu[file_path]
 
-        # Requests/s vs. Timestamp
-        axs[0].plot(data['Timestamp'], data['Requests/s'],
+        if panel == 0:
+            # Requests/s vs. Timestamp
+            ax.plot(data['Timestamp'], data['Requests/s'],
                     label=f'{file_name} - Requests/s', color=color)
-
-        # Failures/s vs. Timestamp
-        axs[1].plot(data['Timestamp'], data['Failures/s'],
+            # Shade the detected phases on the service's own graph
+            if num_datasets == 1:
+                for phase, (start, end) in all_summaries[file_path].get('phases', {}).items():
+                    ax.axvspan(start, end, color=PHASE_COLORS[phase], alpha=0.1,
+                               label=f'{PHASE_LABELS[phase]} phase')
+        elif panel == 1:
+            # Failures/s vs. Timestamp
+            ax.plot(data['Timestamp'], data['Failures/s'],
                     label=f'{file_name} - Failures/s', color=color)
-
-        # Response Time Percentiles vs. Timestamp
-        percentiles = ['50%', '75%', '99%']
-        for percentile in percentiles:
-            axs[2].plot(data['Timestamp'], data[percentile], label=f'{
-                        file_name} - {percentile} Response Time', color=color)
-
-        # Responses/s vs. Timestamp
-        axs[3].plot(data['Timestamp'], data['Responses/s'],
+        elif panel == 2:
+            # Response Time Percentiles vs. Timestamp
+            for percentile in ['50%', '75%', '99%']:
+                ax.plot(data['Timestamp'], data[percentile],
+                        label=f'{file_name} - {percentile} Response Time', color=color)
+        elif panel == 3:
+            # Responses/s vs. Timestamp
+            ax.plot(data['Timestamp'], data['Responses/s'],
                     label=f'{file_name} - Responses/s (Smoothed)', color=color)
-
-        # Cumulative Requests and Failures Over Time
-        # TODO: make it requests and response
-        axs[4].plot(data['Timestamp'], data['Total Request Count'],
+        elif panel == 4:
+            # Cumulative Requests and Failures Over Time
+            # TODO: make it requests and response
+            ax.plot(data['Timestamp'], data['Total Request Count'],
                     label=f'{file_name} - Cumulative Requests', color=color)
-
-        # Response Time Distribution (Histogram)
-        axs[5].hist(data['Total Average Response Time'].dropna(),
+        elif panel == 5:
+            # Response Time Distribution (Histogram)
+            ax.hist(data['Total Average Response Time'].dropna(),
                     bins=30, color=color, alpha=0.7, label=f'{file_name}')
-
-        # Load (User Count) vs Response Time
-        axs[6].scatter(data['User Count'], data['Total Average Response Time'],
+        elif panel == 6:
+            # Load (User Count) vs Response Time
+            ax.scatter(data['User Count'], data['Total Average Response Time'],
                        color=color, alpha=0.5, label=f'{file_name}')
-
-        # User Count vs Various Metrics
-        axs[7].plot(data['Timestamp'], data['User Count'],
+            knee = all_summaries[file_path].get('Knee User Count')
+            if knee is not None:
+                ax.axvline(knee, color=color, linestyle='--',
+                           label=f'{file_name} - Throughput Knee')
+        elif panel == 7:
+            # User Count vs Various Metrics
+            ax.plot(data['Timestamp'], data['User Count'],
                     label=f'{file_name} - User Count', color=color)
+            # Mark the load profile's stages on the service's own graph
+            if num_datasets == 1:
+                for index, (stage, (start, end)) in enumerate(all_summaries[file_path].get('stages', {}).items()):
+                    ax.axvspan(start, end, color='grey', alpha=0.1 if index % 2 else 0.2)
+                    ax.text(start, 0, f' {stage}', fontsize='small', va='bottom')
+        elif panel == 8:
+            # Total Average Content Size Over Time
+            ax.plot(data['Timestamp'], data['Total Average Content Size'],
+                    label=f'{file_name} - Average Content Size', color=color)
+        elif panel == 9:
+            ax.plot(cpu['Timestamp'], cpu['benchmark_cpu_usage'],
+                    label=f'{file_name} - Cpu Usage', color=color)
+        elif panel == 10:
+            ax.plot(cpu['Timestamp'], cpu['db_cpu_usage'],
+                    label=f'{file_name} - Cpu Usage', color=color)
+        elif panel == 11:
+            # Add server memory usage chart
+            ax.plot(cpu['Timestamp'], cpu['benchmark_mem_usage_mb'],
+                    label=f'{file_name} - Server Memory Usage (MB)', color=color)
+        elif panel == 12:
+            # Add database memory usage chart
+            ax.plot(cpu['Timestamp'], cpu['db_mem_usage_mb'],
+                    label=f'{file_name} - Database Memory Usage (MB)', color=color)
+        elif panel in OPTIONAL_PANELS and OPTIONAL_PANELS[panel] not in cpu.columns:
+            continue
+        elif panel == 13:
+            ax.plot(cpu['Timestamp'], cpu['benchmark_net_rx_mb_s'],
+                    label=f'{file_name} - Received', color=color)
+            ax.plot(cpu['Timestamp'], cpu['benchmark_net_tx_mb_s'],
+                    label=f'{file_name} - Sent', color=color, linestyle='--')
+        elif panel == 14:
+            ax.plot(cpu['Timestamp'], cpu['db_io_write_mb_s'],
+                    label=f'{file_name} - Write', color=color)
+            ax.plot(cpu['Timestamp'], cpu['db_io_read_mb_s'],
+                    label=f'{file_name} - Read', color=color, linestyle='--')
+        elif panel == 15:
+            ax.plot(cpu['Timestamp'], cpu['pg_xact_commit_s'],
+                    label=f'{file_name} - Commits/s', color=color)
+            ax.plot(cpu['Timestamp'], cpu['pg_xact_rollback_s'],
+                    label=f'{file_name} - Rollbacks/s', color=color, linestyle='--')
+        elif panel == 16:
+            for wait, linestyle in [('lock', '-'), ('lwlock', '--'), ('io', ':'), ('other', '-.')]:
+                ax.plot(cpu['Timestamp'], cpu[f'pg_waiting_{wait}'],
+                        label=f'{file_name} - {wait.upper() if wait == "io" else wait.title()}',
+                        color=color, linestyle=linestyle)
+        elif panel == 17:
+            ax.plot(cpu['Timestamp'], cpu['pgbouncer_cl_waiting'],
+                    label=f'{file_name} - Waiting Clients', color=color)
 
-        # Total Average Content Size Over Time
-        axs[8].plot(data['Timestamp'], data['Total Average Content Size'], label=f'{
-                    file_name} - Average Content Size', color=color)
+    # Setting titles, labels, and legends
+    ax.set_title(PANEL_TITLES[panel])
+    ax.set_xlabel('Time (seconds)')
+    if num_datasets > 10:
+        # Long comparisons move the legend beside the plot instead of covering it
+        ax.legend(loc='upper left', bbox_to_anchor=(1, 1), fontsize='small')
+    elif num_datasets:
+        ax.legend()
+    ax.grid(True)
 
-        axs[9].plot(all_cpu[file_path]['Timestamp'], all_cpu[file_path]
-                    ['benchmark_cpu_usage'], label=f'{file_name} - Cpu Usage', color=color)
 
-        axs[10].plot(all_cpu[file_path]['Timestamp'], all_cpu[file_path]
-                     ['db_cpu_usage'], label=f'{file_name} - Cpu Usage', color=color)
+def render_panel(panel, all_data, all_summaries, all_cpu):
+    # Renders one panel as its own figure and returns the PNG bytes, safe to run in a worker
+    width, height = PANEL_SIZE
+    if panel == len(PANEL_TITLES) - 1:
+        metrics = {metric for summary in all_summaries.values() for metric in summary}
+        height = max(height, (len(metrics) + 2) * TABLE_ROW_HEIGHT)
+    fig, ax = plt.subplots(figsize=(width, height))
+    draw_panel(ax, panel, all_data, all_summaries, all_cpu)
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png')
+    plt.close(fig)
+    return buffer.getvalue()
 
-        # Add server memory usage chart
-        axs[11].plot(all_cpu[file_path]['Timestamp'],
-                     all_cpu[file_path]['benchmark_mem_usage_mb'].str.rstrip(
-            'MiB').astype(float),
-            label=f'{file_name} - Server Memory Usage (MB)',
-            color=color)
 
-        # Add database memory usage chart
-        axs[12].plot(all_cpu[file_path]['Timestamp'],
-                     all_cpu[file_path]['db_mem_usage_mb'].str.rstrip(
-            'MiB').astype(float),
-            label=f'{file_name} - Database Memory Usage (MB)',
-            color=color)
+def stitch_panels(panels, output_path):
+    # Stacks the panel images vertically into one PNG, all panels share the same width
+    images = [mpimg.imread(io.BytesIO(panel), format='png') for panel in panels]
+    plt.imsave(output_path, np.vstack(images))
 
-    # Setting titles, labels, and legends
-    titles = ['Requests per Second Over Time', 'Failures per Second Over Time', 'Response Time Percentiles Over Time',
-              'Responses per Second Over Time', 'Cumulative Requests Over Time', 'Response Time Distribution',
-              'Load vs Response Time', 'User Count Over Time', 'Average Content Size Over Time', 'Server Cpu Usage', 'Database Cpu Usage',    'Server Memory Usage Over Time',
-              'Database Memory Usage Over Time', 'Summary Table']
-
-    for ax, title in zip(axs, titles):
-        ax.set_title(title)
-        ax.set_xlabel('Time (seconds)')
-        ax.legend()
-        ax.grid(True)
-
-    # # Comprehensive Summary Table at the end
-    # summary_df = pd.DataFrame(all_summaries)
-    # table = axs[9].table(cellText=summary_df.values, rowLabels=summary_df.index, colLabels=summary_df.columns, loc='center')
-    # table.auto_set_font_size(False)
-    # table.set_fontsize(10)
-    # table.scale(1, 2)
-    # axs[9].axis('tight')
-    # axs[9].axis('off')
-    plot_summary_of_all(all_summaries, axs[-1])
-
-    # Adjust layout
-    plt.tight_layout()
-    if len(all_data) == 1:
+
+def available_panels(all_cpu):
+    return [panel for panel in range(len(PANEL_TITLES))
+            if panel not in OPTIONAL_PANELS
+            or any(OPTIONAL_PANELS[panel] in cpu.columns for cpu in all_cpu.values())]
+
+
+def compare_and_plot(all_data, all_summaries, all_cpu, custom_result_file_name=None):
+    if len(all_data) != len(all_summaries) != len(all_cpu):
+        raise ValueError(
+            "all_data, all_summaries, all_cpu should have same length")
+    panels = [render_panel(panel, all_data, all_summaries, all_cpu)
+              for panel in available_panels(all_cpu)]
+    stitch_panels(panels, comparison_output_path(all_summaries, custom_result_file_name))
+
+
+def comparison_output_path(all_summaries, custom_result_file_name=None):
+    if len(all_summaries) == 1:
         file_location = list(all_summaries.keys())[0]
-        plt.savefig(file_location.replace(
-            "benchmark_stats_history.csv", "graph.png"))
-    else:
-        if custom_result_file_name == None:
-            # Save plot
-            plt.savefig('/mnt/data/comparison_graph.png')
-        else:
-            plt.savefig('/mnt/data/'+custom_result_file_name)
+        return file_location.replace("benchmark_stats_history.csv", "graph.png")
+    if custom_result_file_name == None:
+        return '/mnt/data/comparison_graph.png'
+    return f'/mnt/data/{custom_result_file_name}.png'
 
 
 def plot_summary_of_all(summaries, ax):
@@ -211,11 +637,31 @@ def plot_summary_of_all(summaries, ax):
     # Define metrics categories
     lower_is_better_metrics = ['Average Failures/s', 'Average Response Time 50% (ms)',
                                'Average Response Time 75% (ms)', 'Average Response Time 99% (ms)',
-                               'Average Response Time (ms)']
-    higher_is_better_metrics = ['Average Requests/s', 'Average Responses/s']
-
-    generic_metrics = [metric for metric in summaries[file_paths[0]].keys(
-    ) if metric not in lower_is_better_metrics + higher_is_better_metrics]
+                               'Average Response Time (ms)'] + \
+        [f'{prefix}Response Time {name} (ms)' for prefix in ('', 'Steady ', 'Corrected ', 'Steady Corrected ')
+         for name in HISTOGRAM_PERCENTILES] + \
+        [f'Send Lag {name} (ms)' for name in HISTOGRAM_PERCENTILES] + \
+        [f'{label} {metric}' for label in PHASE_LABELS.values()
+         for metric in ('Average Failures/s', 'Average Response Time 99% (ms)')]
+    lower_is_better_metrics += ['Average DB Sessions Waiting on Locks',
+                                'Peak PgBouncer Waiting Clients', 'Peak PgBouncer Wait (ms)']
+    higher_is_better_metrics = ['Average Requests/s', 'Average Responses/s', 'DB Buffer Cache Hit Ratio (%)'] + \
+        [f'{label} Average Requests/s' for label in PHASE_LABELS.values()] + \
+        SATURATION_METRICS
+
+    # Services may report different optional metrics, so collect them from all summaries
+    generic_metrics = []
+    for summary in summaries.values():
+        for metric in summary.keys():
+            if metric in lower_is_better_metrics + higher_is_better_metrics + generic_metrics:
+                continue
+            # Stage metrics depend on the load profile of each run
+            if metric.endswith(' Stage Average Requests/s'):
+                higher_is_better_metrics.append(metric)
+            elif (' Stage ' in metric and metric.endswith('(ms)')) or metric.endswith(' Stage Average Failures/s'):
+                lower_is_better_metrics.append(metric)
+            else:
+                generic_metrics.append(metric)
     # Combine all metrics into one set for table headers
     all_metrics = lower_is_better_metrics + \
         higher_is_better_metrics + generic_metrics
@@ -237,6 +683,8 @@ def plot_summary_of_all(summaries, ax):
         row = [metric]
         metric_values = [transposed_summaries[metric][path]
                          for path in file_paths if transposed_summaries[metric][path] != 'N/A']
+        if not metric_values:
+            continue
         base_val = min(metric_values) if metric in lower_is_better_metrics else max(
             metric_values)
 
@@ -256,7 +704,7 @@ def plot_summary_of_all(summaries, ax):
                 combined_scores[path] += score_update
             else:
                 color = 'black'
-                formatted_val = f"{val:.2f}"
+                formatted_val = f"{val:.2f}" if val != 'N/A' else val
             row.append((formatted_val, color))
         table_data.append(row)
 
@@ -305,6 +753,8 @@ def plot_summary_of_all(summaries, ax):
 def validate_and_convert_to_numeric(summary):
     numeric_summary = {}
     for key, value in summary.items():
+        if isinstance(value, dict):
+            continue  # Structured entries such as 'phases' are not table metrics
         try:
             numeric_summary[key] = float(value)
         except ValueError:
@@ -325,198 +775,69 @@ def get_adjusted_file_name(file_path):
     return (' '.join(relevant_parts)).replace("-", " ")
 
 
-# Initialize dictionaries
-all_summaries = {'db_test': {}, 'no_db_test': {}}
-all_data = {'db_test': {}, 'no_db_test': {}}
-all_cpu = {'db_test': {}, 'no_db_test': {}}
+def merge_data_and_cpu(data, cpu, direction=MERGE_DIRECTION, tolerance=MERGE_TOLERANCE):
+    # As-of join on the epoch timestamp: by default each Locust row gets the latest
+    # resource sample taken strictly before it, rows without one are left empty
+    data = data.drop(columns=RESOURCE_COLUMNS, errors='ignore').sort_values(
+        'timestamp').reset_index(drop=True)
+    samples = cpu[['timestamp'] + RESOURCE_COLUMNS].sort_values('timestamp')
+    merged = pd.merge_asof(data, samples, on='timestamp', direction=direction,
+                           tolerance=int(tolerance) if tolerance else None,
+                           allow_exact_matches=False)
+    # Missing samples are exported as null rather than NaN, which is not valid JSON
+    merged[RESOURCE_COLUMNS] = merged[RESOURCE_COLUMNS].astype(
+        object).where(merged[RESOURCE_COLUMNS].notna(), None)
+    return merged
 
-# Find all benchmark_stats_history.csv files in /data directory
-file_paths = glob.glob(
-    '/mnt/data/**/benchmark_stats_history.csv', recursive=True)
 
-# Process and plot each file and collect summaries
-for file_path in file_paths:
-    print(f"Processing file: {file_path}")
-    parent_dir = file_path.split('/')[-2]  # Extract parent directory
-    data, summary = process_file(file_path)
-    cpu, summary = process_file_cpu_usage(file_path, summary)
-    compare_and_plot({file_path: data}, {file_path: summary}, {file_path: cpu})
+def shard_file_name(service_name):
+    return re.sub(r'[^A-Za-z0-9_]+', '-', service_name).strip('-') + '.json'
 
-    all_summaries[parent_dir][file_path] = summary
-    all_data[parent_dir][file_path] = data
-    all_cpu[parent_dir][file_path] = cpu
-
-# You may need to adjust the plotting function to handle data segregated by parent directory
-# compare_and_plot(all_data, all_summaries, all_cpu)
-for parent_dir in all_data:
-    compare_and_plot(all_data[parent_dir], all_summaries[parent_dir],
-                     all_cpu[parent_dir], custom_result_file_name="comparison_graph_"+parent_dir)
-# Assuming 'df' is your DataFrame
-
-
-def print_all_columns_and_first_five_rows(df):
-    # Set display option to show all columns
-    pd.set_option('display.max_columns', None)
-
-    # Print the first 5 rows
-    print(df.head())
-
-
-def merge_data_and_cpu(data, cpu, print_data=False):
-    if print_data:
-        print_all_columns_and_first_five_rows(data)
-        print_all_columns_and_first_five_rows(cpu)
-
-    # Ensure data and cpu are sorted by 'timestamp'
-    data = data.sort_values('timestamp').reset_index(drop=True)
-    cpu = cpu.sort_values('timestamp').reset_index(drop=True)
-
-    # Initialize the columns in data for CPU usage and memory usage
-    data['benchmark_cpu_usage'] = np.nan
-    data['benchmark_mem_usage_mb'] = np.nan
-    data['db_cpu_usage'] = np.nan
-    data['db_mem_usage_mb'] = np.nan
-
-    cpu_index = 0
-    cpu_length = len(cpu)
-
-    for index, row in data.iterrows():
-        # Move the CPU index forward if the CPU timestamp is less than or equal to the current data timestamp
-        while cpu_index < cpu_length and float(cpu.loc[cpu_index, 'timestamp']) <= float(row['timestamp']):
-            cpu_index += 1
-            if print_data and cpu_index < 5 and cpu_index < cpu_length:
-                print({
-                    "cpu": cpu.loc[cpu_index],
-                    "cpu_index": cpu_index,
-                    "cpu_timestamp": cpu.loc[cpu_index, 'timestamp'],
-                    "data_timestamp": row['timestamp'],
-                    "cpu_length": cpu_length
-                })
 
-        if cpu_index >= cpu_length:
-            break
-
-        if print_data and cpu_index < 5 and cpu_index < cpu_length:
-            print("DONE", {
-                "cpu": cpu.loc[cpu_index],
-                "cpu_index": cpu_index,
-                "cpu_timestamp": cpu.loc[cpu_index, 'timestamp'],
-                "data_timestamp": row['timestamp'],
-                "cpu_length": cpu_length
-            })
-
-        # If the CPU index is within the bounds and the CPU timestamp is greater than the data timestamp, merge the CPU data
-        if cpu_index < cpu_length and cpu.loc[cpu_index, 'timestamp'] > row['timestamp']:
-            if print_data and cpu_index < 5:
-                print("merging")
-            data.at[index, 'benchmark_cpu_usage'] = cpu.loc[cpu_index,
-                                                            'benchmark_cpu_usage']
-            data.at[index, 'benchmark_mem_usage_mb'] = float(cpu.loc[cpu_index, 'benchmark_mem_usage_mb'].rstrip('MiB'))
-
-            data.at[index, 'db_cpu_usage'] = cpu.loc[cpu_index, 'db_cpu_usage']
-            data.at[index, 'db_mem_usage_mb'] = float(cpu.loc[cpu_index, 'db_mem_usage_mb'].rstrip('MiB'))
-
-
-    return data
-
-
-def merge_data_and_cpu(data, cpu, print_data=False):
-    # Ensure data and cpu are sorted by 'timestamp'
-    data = data.sort_values('timestamp').reset_index(drop=True)
-    cpu = cpu.sort_values('timestamp').reset_index(drop=True)
-
-    # Initialize the columns in data for CPU usage and memory usage
-    data['benchmark_cpu_usage'] = None
-    data['benchmark_mem_usage_mb'] = None
-    data['db_cpu_usage'] = None
-    data['db_mem_usage_mb'] = None
-
-    cpu_index = 0
-    cpu_length = len(cpu)
-
-    for index, row in data.iterrows():
-        # Move the CPU index forward if the CPU timestamp is less than the current data timestamp
-        while cpu_index < cpu_length and cpu.loc[cpu_index, 'timestamp'] < row['timestamp']:
-            cpu_index += 1
-
-        if cpu_index >= cpu_length:
-            break
-
-        # Check if the previous CPU timestamp is less than the current data timestamp
-        if cpu_index > 0 and cpu.loc[cpu_index - 1, 'timestamp'] < row['timestamp']:
-            # Use the previous CPU index for merging as its timestamp is less than the data timestamp
-            prev_cpu_index = cpu_index - 1
-            data.at[index, 'benchmark_cpu_usage'] = cpu.loc[prev_cpu_index,
-                                                            'benchmark_cpu_usage']
-            data.at[index, 'benchmark_mem_usage_mb'] = str(
-                cpu.loc[prev_cpu_index, 'benchmark_mem_usage_mb']).rstrip('MiB')
-            data.at[index, 'db_cpu_usage'] = cpu.loc[prev_cpu_index, 'db_cpu_usage']
-            data.at[index, 'db_mem_usage_mb'] = float(str(cpu.loc[cpu_index, 'db_mem_usage_mb']).rstrip('MiB'))
-        else:
-            # Remove the CPU and memory fields by setting them to None
-            data.at[index, 'benchmark_cpu_usage'] = None
-            data.at[index, 'benchmark_mem_usage_mb'] = None
-            data.at[index, 'db_cpu_usage'] = None
-            data.at[index, 'db_mem_usage_mb'] = None
-    return data
-
-
-def data_json(all_summaries, all_data, all_cpu):
-    def custom_serializer(obj):
-        if isinstance(obj, pd.DataFrame):
-            return obj.to_dict(orient='records')
-        raise TypeError(f'Object of type {
-                        obj.__class__.__name__} is not JSON serializable')
-
-    combined_data = {}
-    print_data = True
+def data_json(all_summaries, all_data, all_cpu, regressions=None):
+    os.makedirs(DASHBOARD_DATA_DIR, exist_ok=True)
+    index = {}
     for parent_dir in all_data:
         for path, data in all_data[parent_dir].items():
             service_name = get_adjusted_file_name(path)
             if isinstance(data, pd.DataFrame):
                 data.fillna(0, inplace=True)
-            if isinstance(all_summaries[parent_dir][path], pd.DataFrame):
-                all_summaries[parent_dir][path].fillna(0, inplace=True)
             if isinstance(all_cpu[parent_dir][path], pd.DataFrame):
                 all_cpu[parent_dir][path].fillna(0, inplace=True)
 
-            merged_data = merge_data_and_cpu(
-                data, all_cpu[parent_dir][path], print_data)
-
-            combined_data[service_name] = {
-                'summary': all_summaries[parent_dir][path],
-                'data': merged_data
+            merged_data = merge_data_and_cpu(data, all_cpu[parent_dir][path])
+
+            # Column-oriented shard: every column name is written once instead of on every row
+            shard = shard_file_name(service_name)
+            columns = {column: merged_data[column].tolist()
+                       for column in merged_data.columns}
+            with open(os.path.join(DASHBOARD_DATA_DIR, shard), 'w') as file:
+                json.dump({'columns': columns}, file, separators=(',', ':'))
+
+            # Metrics without data (e.g. a stage without requests) are NaN, which is not valid
+            # JSON and would stop the dashboard from loading; they are exported as null
+            summary = {key: None if isinstance(value, (float, np.floating)) and np.isnan(value) else value
+                       for key, value in all_summaries[parent_dir][path].items()}
+            index[service_name] = {
+                'summary': summary,
+                'phases': summary.pop('phases', None),
+                'stages': summary.pop('stages', None),
+                'regressions': (regressions or {}).get(history_key(path), []),
+                'test_type': parent_dir,
+                'rows': len(merged_data),
+                'shard': f"data/{shard}",
             }
 
-            print_data = False
-
-    try:
-        all_data_json = json.dumps(combined_data, default=custom_serializer)
-        with open('/mnt/data/benchmark-app/public/data.json', 'w') as file:
-            file.write(all_data_json)
-
-        print("JSON data successfully written to file.")
-    except TypeError as e:
-        print(f"Serialization error: {e}")
-
-
-data_json(all_summaries, all_data, all_cpu)
+    with open(DASHBOARD_INDEX_PATH, 'w') as file:
+        json.dump({'services': index}, file, indent=1, default=float)
 
+    # Remove shards of services that no longer have results
+    shards = {os.path.basename(entry['shard']) for entry in index.values()}
+    for shard_path in glob.glob(os.path.join(DASHBOARD_DATA_DIR, '*.json')):
+        if shard_path != DASHBOARD_INDEX_PATH and os.path.basename(shard_path) not in shards:
+            os.remove(shard_path)
 
-def update_image_urls(readme_path):
-    version = str(int(time.time()))
-    with open(readme_path, 'r', encoding='utf-8') as file:
-        content = file.read()
-    pattern = r'(!\[.*?\]\()(.*?)(\))'
-
-    def clean_and_update_url(match):
-        prefix, url, closing = match.groups()
-        parsed_url = urlparse(url)
-        new_url = urlunparse(parsed_url._replace(query=f"v={version}"))
-        return f"{prefix}{new_url}{closing}"
-    updated_content = re.sub(pattern, clean_and_update_url, content)
-    with open(readme_path, 'w', encoding='utf-8') as file:
-        file.write(updated_content)
+    print(f"Dashboard index and {len(index)} data shards written.")
 
 
 def update_image_urls(readme_path):
@@ -562,12 +883,336 @@ def generate_graph_sections(all_data, section_type):
     return graph_sections
 
 
-# Generate dynamic README.md
-db_endpoint_graphs = generate_graph_sections(all_data['db_test'], 'db_test')
-static_endpoint_graphs = generate_graph_sections(
-    all_data['no_db_test'], 'no_db_test')
-generate_dynamic_readme('/mnt/data/README_template.md',
-                        '/mnt/data/README.md', db_endpoint_graphs, static_endpoint_graphs)
+def hash_file(path):
+    with open(path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+# Any change to this script or to the settings it reads invalidates every cached output
+SCRIPT_FINGERPRINT = hashlib.sha256(json.dumps(
+    [hash_file(__file__), MERGE_DIRECTION, MERGE_TOLERANCE, GRAPH_MAX_POINTS,
+     WARMUP_SECONDS, STEADY_WINDOW, STEADY_MAX_CV, SLO_P99_MS, KNEE_BINS]).encode()).hexdigest()
+
+
+def service_fingerprint(file_path):
+    digest = hashlib.sha256(SCRIPT_FINGERPRINT.encode())
+    for name in RESULT_FILES:
+        path = file_path.replace("benchmark_stats_history.csv", name)
+        if os.path.exists(path):
+            digest.update(f"{name}:{hash_file(path)}".encode())
+    return digest.hexdigest()
+
+
+def combined_fingerprint(fingerprints):
+    return hashlib.sha256(json.dumps(sorted(fingerprints)).encode()).hexdigest()
+
+
+def load_manifest():
+    if FORCE_REGENERATE or not os.path.exists(MANIFEST_PATH):
+        return {'services': {}, 'outputs': {}}
+    with open(MANIFEST_PATH, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_manifest(manifest):
+    os.makedirs(GRAPH_CACHE_DIR, exist_ok=True)
+    with open(MANIFEST_PATH, 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=2, default=float)
+
+
+def cache_paths(fingerprint):
+    return (os.path.join(GRAPH_CACHE_DIR, f"{fingerprint}_data.parquet"),
+            os.path.join(GRAPH_CACHE_DIR, f"{fingerprint}_cpu.parquet"))
+
 
-# Update image URLs
-update_image_urls('/mnt/data/README.md')
+def is_service_cached(file_path, fingerprint, manifest):
+    entry = manifest['services'].get(file_path)
+    return (entry is not None and entry['fingerprint'] == fingerprint
+            and os.path.exists(file_path.replace("benchmark_stats_history.csv", "graph.png"))
+            and all(os.path.exists(path) for path in cache_paths(fingerprint)))
+
+
+def load_cached_service(file_path, fingerprint, manifest):
+    data_path, cpu_path = cache_paths(fingerprint)
+    return file_path, pd.read_parquet(data_path), manifest['services'][file_path]['summary'], pd.read_parquet(cpu_path)
+
+
+def process_service(file_path, fingerprint):
+    # Parses one service's results, renders its own graph.png and caches the parsed
+    # frames for the next run; runs in a worker process
+    print(f"Processing file: {file_path}")
+    data, summary = process_file(file_path)
+    cpu, summary = process_file_cpu_usage(file_path, summary)
+    cpu, summary = process_postgres_stats(file_path, cpu, summary)
+    summary = process_cache_stats(file_path, summary)
+    summary = process_phases(data, summary)
+    summary = process_stages(file_path, data, summary)
+    summary = process_saturation(data, summary)
+    summary = process_response_time_histogram(file_path, data, summary)
+    summary = process_corrected_histogram(file_path, data, summary)
+
+    # Summaries above use every row, graphs and the dashboard get a bounded number of points
+    data = downsample(data, 'Timestamp', DOWNSAMPLE_COLUMNS)
+    cpu = downsample(cpu, 'Timestamp', RESOURCE_COLUMNS + INTERNALS_COLUMNS)
+    compare_and_plot({file_path: data}, {file_path: summary}, {file_path: cpu})
+
+    os.makedirs(GRAPH_CACHE_DIR, exist_ok=True)
+    data_path, cpu_path = cache_paths(fingerprint)
+    data.to_parquet(data_path)
+    cpu.to_parquet(cpu_path)
+    return file_path, data, summary, cpu
+
+
+def service_facets(file_path):
+    # Language and framework from backends/<language>/<framework>/tests/results/...
+    parts = file_path.split(os.sep)
+    if 'backends' not in parts:
+        return {'language': 'other', 'framework': 'other'}
+    index = parts.index('backends')
+    return {'language': parts[index + 1], 'framework': parts[index + 2]}
+
+
+def is_included(file_path):
+    # Same matching as INCLUDE in scripts/start_tests.sh: any language or framework listed
+    if not GRAPH_INCLUDE:
+        return True
+    return any(pattern in service_facets(file_path).values() for pattern in GRAPH_INCLUDE)
+
+
+def comparison_groups(all_data):
+    # {output name: (test type, file paths)}, one per test type plus one per facet value
+    groups = {}
+    for parent_dir in all_data:
+        paths = [path for path in all_data[parent_dir] if is_included(path)]
+        # GRAPH_INCLUDE can leave a test type without services, there is nothing to compare
+        if not paths:
+            continue
+        groups["comparison_graph_"+parent_dir] = (parent_dir, paths)
+        if GRAPH_FACET:
+            for value in sorted({service_facets(path)[GRAPH_FACET] for path in paths}):
+                groups[f"comparison_graph_{parent_dir}_{value}"] = (
+                    parent_dir, [path for path in paths if service_facets(path)[GRAPH_FACET] == value])
+    return groups
+
+
+def open_history():
+    os.makedirs(HISTORY_DIR, exist_ok=True)
+    connection = sqlite3.connect(HISTORY_DB)
+    if connection.execute('PRAGMA user_version').fetchone()[0] < HISTORY_SCHEMA_VERSION:
+        # Older histories pooled per-second samples; the archive is the source of truth
+        connection.executescript('DROP TABLE IF EXISTS samples; DROP TABLE IF EXISTS runs;')
+        connection.execute(f'PRAGMA user_version = {HISTORY_SCHEMA_VERSION}')
+    connection.executescript('''
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY,
+            backend TEXT NOT NULL,
+            test_type TEXT NOT NULL,
+            run_started_at TEXT NOT NULL,
+            image_hash TEXT NOT NULL,
+            archive_path TEXT NOT NULL UNIQUE,
+            requests_per_s REAL,
+            p99_ms REAL
+        );
+        CREATE INDEX IF NOT EXISTS runs_by_service ON runs (backend, test_type, run_started_at);
+    ''')
+    return connection
+
+
+def ingest_history(connection):
+    # Adds archived runs not seen before; the archive layout is
+    # results_history/<language>/<framework>/<test_type>/<run_started_at>_<image_hash>/
+    known = {row[0] for row in connection.execute('SELECT archive_path FROM runs')}
+    added = 0
+    for file_path in sorted(glob.glob(os.path.join(HISTORY_DIR, '**', 'benchmark_stats_history.csv'), recursive=True)):
+        archive_path = os.path.relpath(os.path.dirname(file_path), HISTORY_DIR)
+        parts = archive_path.split(os.sep)
+        if archive_path in known or len(parts) != 4:
+            continue
+        run_started_at, _, image_hash = parts[3].partition('_')
+        data, _ = process_file(file_path)
+        # One value per metric and run, the mean over the steady state; the per-second samples
+        # are autocorrelated and include the warm-up and ramp, so they are not compared directly.
+        # Runs that never settled are kept with NULL values and left out of the comparisons
+        steady = detect_phases(data).get('steady')
+        rows = data[data['Timestamp'].between(*steady)] if steady else data.iloc[0:0]
+        values = [float(rows[column].mean()) if len(rows) else None
+                  for column, _ in HISTORY_METRICS.values()]
+        connection.execute(
+            'INSERT INTO runs (backend, test_type, run_started_at, image_hash, archive_path, requests_per_s, p99_ms) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            ('/'.join(parts[:2]), parts[2], run_started_at, image_hash, archive_path, *values))
+        added += 1
+    connection.commit()
+    return added
+
+
+def student_t_sf(t, df):
+    # P(T > t) for Student's t with integer degrees of freedom, from the closed-form series of
+    # its cumulative distribution (Abramowitz and Stegun 26.7.3 and 26.7.4)
+    theta = math.atan(t / math.sqrt(df))
+    cos2 = math.cos(theta) ** 2
+    if df % 2:
+        term, series = 1.0, 1.0 if df > 1 else 0.0
+        for k in range(2, df - 1, 2):
+            term *= cos2 * k / (k + 1)
+            series += term
+        central = 2 / math.pi * (theta + math.sin(theta) * math.cos(theta) * series)
+    else:
+        term = series = 1.0
+        for k in range(1, df - 1, 2):
+            term *= cos2 * k / (k + 1)
+            series += term
+        central = math.sin(theta) * series
+    return (1 - central) / 2
+
+
+def prediction_p_value(latest, baseline):
+    # One-sided p-value for the latest run lying this far above the earlier runs, treating
+    # the runs as independent draws from a normal distribution (t prediction interval)
+    n = len(baseline)
+    spread = float(np.std(baseline, ddof=1))
+    if spread == 0:
+        return 0.0 if latest > baseline[0] else 1.0
+    t = (latest - float(np.mean(baseline))) / (spread * math.sqrt(1 + 1 / n))
+    return student_t_sf(t, n - 1)
+
+
+def detect_regressions(connection):
+    # {"<language>/<framework>/<test_type>": [regression, ...]} comparing each service's
+    # latest archived run with the runs before it, one steady-state value per run
+    regressions = {}
+    services = connection.execute('SELECT DISTINCT backend, test_type FROM runs').fetchall()
+    for backend, test_type in services:
+        runs = pd.read_sql_query(
+            'SELECT * FROM runs WHERE backend = ? AND test_type = ? ORDER BY run_started_at DESC',
+            connection, params=(backend, test_type))
+        for metric, (_, higher_is_better) in HISTORY_METRICS.items():
+            if pd.isna(runs[metric].iloc[0]):
+                # The latest run has no steady state to compare
+                continue
+            values = runs[metric].dropna()
+            latest = float(values.iloc[0])
+            baseline = values.iloc[1:HISTORY_RUNS + 1].to_numpy()
+            # The run-to-run spread needs at least two earlier runs
+            if len(baseline) < 2:
+                continue
+            baseline_mean = float(np.mean(baseline))
+            if baseline_mean == 0:
+                continue
+            change = (latest - baseline_mean) / baseline_mean
+            if higher_is_better:
+                p_value = prediction_p_value(-latest, -baseline)
+                worse = -change
+            else:
+                p_value = prediction_p_value(latest, baseline)
+                worse = change
+            if worse > REGRESSION_THRESHOLD and p_value < REGRESSION_ALPHA:
+                regressions.setdefault(f"{backend}/{test_type}", []).append({
+                    'metric': metric, 'change': change, 'p_value': p_value,
+                    'baseline_runs': len(baseline),
+                })
+                print(f"Regression in {backend} {test_type}: {metric} changed by {change:+.1%} "
+                      f"against the previous {len(baseline)} runs (p={p_value:.2g})")
+    return regressions
+
+
+def history_key(file_path):
+    facets = service_facets(file_path)
+    return f"{facets['language']}/{facets['framework']}/{file_path.split('/')[-2]}"
+
+
+def is_output_current(name, output_path, fingerprint, manifest):
+    return manifest['outputs'].get(name) == fingerprint and os.path.exists(output_path)
+
+
+def main():
+    # Initialize dictionaries
+    all_summaries = {'db_test': {}, 'no_db_test': {}}
+    all_data = {'db_test': {}, 'no_db_test': {}}
+    all_cpu = {'db_test': {}, 'no_db_test': {}}
+
+    # Find all benchmark_stats_history.csv files in /data directory
+    file_paths = [path for path in glob.glob('/mnt/data/**/benchmark_stats_history.csv', recursive=True)
+                  if not path.startswith(HISTORY_DIR + os.sep)]
+
+    connection = open_history()
+    print(f"{ingest_history(connection)} new runs added to the results history")
+    regressions = detect_regressions(connection)
+    connection.close()
+
+    manifest = load_manifest()
+    fingerprints = {file_path: service_fingerprint(
+        file_path) for file_path in file_paths}
+    stale_paths = [file_path for file_path in file_paths
+                   if not is_service_cached(file_path, fingerprints[file_path], manifest)]
+    print(f"{len(file_paths) - len(stale_paths)} of {len(file_paths)} services unchanged since the last run")
+
+    def collect(file_path, data, summary, cpu):
+        parent_dir = file_path.split('/')[-2]  # Extract parent directory
+        all_summaries.setdefault(parent_dir, {})[file_path] = summary
+        all_data.setdefault(parent_dir, {})[file_path] = data
+        all_cpu.setdefault(parent_dir, {})[file_path] = cpu
+
+    with ProcessPoolExecutor(max_workers=GRAPH_WORKERS) as executor:
+        # Process and plot each changed file in parallel, unchanged ones come from the cache
+        processed = dict((result[0], result) for result in executor.map(
+            process_service, stale_paths, [fingerprints[path] for path in stale_paths]))
+        for file_path in file_paths:
+            if file_path in processed:
+                collect(*processed[file_path])
+                manifest['services'][file_path] = {
+                    'fingerprint': fingerprints[file_path], 'summary': processed[file_path][2]}
+            else:
+                collect(*load_cached_service(file_path, fingerprints[file_path], manifest))
+
+        # Comparison graphs are redrawn only when one of their services changed; every
+        # panel of every comparison renders as a separate task, then they are stitched
+        comparisons = {}
+        groups = comparison_groups(all_data)
+        if not groups:
+            print(f"Warning: GRAPH_INCLUDE={','.join(GRAPH_INCLUDE)} matches no services, skipping the comparison graphs")
+        for name, (parent_dir, paths) in groups.items():
+            fingerprint = combined_fingerprint(
+                [fingerprints[path] for path in paths])
+            if is_output_current(name, f"/mnt/data/{name}.png", fingerprint, manifest):
+                continue
+            group = [{path: frames[parent_dir][path] for path in paths}
+                     for frames in (all_data, all_summaries, all_cpu)]
+            comparisons[name] = (fingerprint, [executor.submit(render_panel, panel, *group)
+                                               for panel in available_panels(group[2])])
+        for name, (fingerprint, panels) in comparisons.items():
+            stitch_panels([panel.result() for panel in panels], f"/mnt/data/{name}.png")
+            manifest['outputs'][name] = fingerprint
+
+    report_fingerprint = combined_fingerprint(
+        list(fingerprints.values()) + [json.dumps(regressions, sort_keys=True)])
+    if is_output_current('dashboard', DASHBOARD_INDEX_PATH, report_fingerprint, manifest):
+        print("Dashboard data and README.md are up to date.")
+    else:
+        data_json(all_summaries, all_data, all_cpu, regressions)
+
+        # Generate dynamic README.md
+        db_endpoint_graphs = generate_graph_sections(
+            all_data['db_test'], 'db_test')
+        static_endpoint_graphs = generate_graph_sections(
+            all_data['no_db_test'], 'no_db_test')
+        generate_dynamic_readme('/mnt/data/README_template.md',
+                                '/mnt/data/README.md', db_endpoint_graphs, static_endpoint_graphs)
+
+        # Update image URLs
+        update_image_urls('/mnt/data/README.md')
+        manifest['outputs']['dashboard'] = report_fingerprint
+
+    # Drop entries of result files that no longer exist
+    manifest['services'] = {path: entry for path, entry in manifest['services'].items()
+                            if path in fingerprints}
+    save_manifest(manifest)
+    referenced = {path for entry in manifest['services'].values()
+                  for path in cache_paths(entry['fingerprint'])}
+    for path in glob.glob(os.path.join(GRAPH_CACHE_DIR, '*.parquet')):
+        if path not in referenced:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
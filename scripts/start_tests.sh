@@ -83,33 +83,43 @@ echo "#########################################################################"
 echo "Found scripts ${#scripts[@]} and after filtering ${#filtered_scripts[@]} scripts to run:"
 echo "${filtered_scripts[@]}"
 
-# Get total number of scripts and multiply by 2 for the two test types
-total_scripts=$((${#filtered_scripts[@]} * 2))
+# Define the test types; TEST_TYPES (comma separated) runs a subset, e.g. TEST_TYPES=db_test,no_db_test
+IFS=',' read -ra test_types <<< "${TEST_TYPES:-db_test,no_db_test,db_pagination_test,db_bulk_test}"
+
+# Pair every script with the test types its backend provides a tests/<test_type>.py for;
+# db_pagination_test and db_bulk_test only exist for the Python backends
+runs=()
+for script in "${filtered_scripts[@]}"; do
+    for test_type in "${test_types[@]}"; do
+        if [[ -f "$(dirname "$script")/tests/$test_type.py" ]]; then
+            runs+=("$script $test_type")
+        fi
+    done
+done
+
+# Get total number of runs
+total_scripts=${#runs[@]}
 
 # Initialize a counter
 counter=1
 
-# Define the test types
-test_types=("db_test" "no_db_test")
+for run in "${runs[@]}"; do
+    read -r script test_type <<< "$run"
+    remaining_tests=$((total_scripts - counter + 1))
+    total_remaining_seconds=$((remaining_tests * LOCUST_RUNTIME))
+    minutes=$((total_remaining_seconds / 60))
+    seconds=$((total_remaining_seconds % 60))
 
-for script in "${filtered_scripts[@]}"; do
-    for test_type in "${test_types[@]}"; do
-        remaining_tests=$((total_scripts - counter + 1))
-        total_remaining_seconds=$((remaining_tests * LOCUST_RUNTIME))
-        minutes=$((total_remaining_seconds / 60))
-        seconds=$((total_remaining_seconds % 60))
+    echo "Running script $counter out of $total_scripts: $script with test_type=$test_type"
+    echo "Estimated remaining time: $minutes minutes, $seconds seconds"
 
-        echo "Running script $counter out of $total_scripts: $script with test_type=$test_type"
-        echo "Estimated remaining time: $minutes minutes, $seconds seconds"
+    export test_type=$test_type
+    bash "$script"
+    echo "Finished running: $script with test_type=$test_type"
 
-        export test_type=$test_type
-        bash "$script"
-        echo "Finished running: $script with test_type=$test_type"
-
-        ((counter++))
-        echo "Sleeping for 5 seconds..."
-        sleep 5
-    done
+    ((counter++))
+    echo "Sleeping for 5 seconds..."
+    sleep 5
 done
 
 cd scripts/graphs